@@ -1,12 +1,21 @@
 import math
+import os
 import pygame
 import random
+import struct
 import sys
 
-pygame.init()
-pygame.mixer.init()
-pygame.mixer.music.load("pacman_playing_song.mp3")
-pygame.mixer.music.play(-1)
+from assets import frame_for_angle, load_image, preload, render_text, rotated_frames, silhouette
+from audio import Music
+from engine import bootstrap
+from level_pack import LevelPack, compile_level, layout_checksum, pack_path
+from maze_grid import DotGrid, SpatialHash
+from profiler import FrameProfiler
+from replay import Replay
+from snapshot import GameRecord, GhostRecord, PacManRecord, RewindBuffer
+from timer_wheel import TimerWheel
+from timestep import FixedTimestep
+
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 TILE_SIZE = 40
@@ -14,6 +23,25 @@ PACMAN_SPEED = 3
 GHOST_SPEED = 2
 DOT_SIZE = 8
 SCORE_PER_DOT = 10
+# Logic runs at a fixed 60 ticks per second (timestep.TICK_RATE); speeds are
+# pixels per tick. Drawing is capped separately and interpolates between ticks.
+RENDER_FPS = 144
+FAST_FORWARD = 8  # game speed while TAB is held
+REWIND_TICKS = 60 * 10  # how far back BACKSPACE can rewind
+
+# Timed effects, in logic ticks; Game.timers fires them
+PACMAN_FRAME_TICKS = 5  # open/closed mouth sprite swap
+PACMAN_MOUTH_TICKS = 10
+GHOST_DECISION_TICKS = 60  # how often a ghost rethinks chasing vs wandering
+CHASE_PROBABILITY = 0.7  # chance a ghost chases Pac-Man rather than wanders on each rethink
+PELLET_PULSE_TICKS = 30
+FRIGHTENED_TICKS = 60 * 6  # how long ghosts stay vulnerable after a power pellet
+FRIGHTENED_SPEED = 1
+GHOST_POINTS = 200  # for the first ghost eaten per power pellet, doubling for each one after
+LEVEL_COMPLETE_TICKS = 60 * 3  # the next level starts on its own after this, or on SPACE
+# Compiled levels from `python level_pack.py`; without them levels are
+# compiled in memory on first use
+LEVEL_PACK_DIR = os.environ.get("PACMAN_LEVEL_DIR", "levels")
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -26,9 +54,36 @@ BLUE = (0, 0, 255)
 GREEN = (0, 255, 0)
 WALL_COLOR = (33, 33, 222)
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
+# Nothing touches SDL until init_engine(); Game runs headless without it
+screen = None
+music = Music()
+# Frame-time breakdown; F3 shows percentiles, PACMAN_PROFILE_TRACE=file.csv logs every frame
+profiler = FrameProfiler(["events", "timers", "pacman", "ghost_ai", "collisions", "walls", "dots", "pellets",
+                          "sprites", "hud", "flip"])
+
+
+def init_engine():
+    # Window and music for interactive play
+    global screen
+    screen = bootstrap(SCREEN_WIDTH, SCREEN_HEIGHT)
+    music.play("pacman_playing_song.mp3")
+
+
+def lerp_position(entity, alpha):
+    # Where to draw an entity `alpha` of the way from its previous tick to this one
+    dx = entity.x - entity.prev_x
+    dy = entity.y - entity.prev_y
+    if abs(dx) > SCREEN_WIDTH // 2 or abs(dy) > SCREEN_HEIGHT // 2:
+        return entity.x, entity.y  # wrapped around the screen edge, don't sweep across it
+    return entity.prev_x + dx * alpha, entity.prev_y + dy * alpha
+
+
+SPRITES = [
+    ('pacman.png', (30, 30)),
+    ('pacman_close.png', (30, 30)),
+    ('ghost.webp', (30, 30)),
+    ('dot.png', (DOT_SIZE, DOT_SIZE)),
+]
 
 MENU = 0
 PLAYING = 1
@@ -110,55 +165,82 @@ LEVEL_LAYOUTS = [
     ]
 ]
 
+# Loaded level packs by level index, shared by every Game in the process
+_level_packs = {}
+
+
+def get_level_pack(level_index):
+    pack = _level_packs.get(level_index)
+    if pack is None:
+        layout = LEVEL_LAYOUTS[level_index]
+        cell_width = SCREEN_WIDTH // len(layout[0])
+        cell_height = SCREEN_HEIGHT // len(layout)
+        path = pack_path(LEVEL_PACK_DIR, level_index)
+        if os.path.exists(path):
+            try:
+                pack = LevelPack.open(path)
+            except (ValueError, struct.error, OSError):
+                pack = None  # empty, truncated or from another format version
+            if pack is not None and (pack.checksum != layout_checksum(layout)
+                                     or (pack.cell_width, pack.cell_height) != (cell_width, cell_height)):
+                pack = None  # compiled from an older LEVEL_LAYOUTS or screen size
+        if pack is None:
+            # Skip the path tables here; ghosts fall back to on-demand BFS
+            pack = LevelPack(compile_level(layout, cell_width, cell_height, nav=False))
+        _level_packs[level_index] = pack
+    return pack
+
+
 class PacMan:
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.prev_x, self.prev_y = x, y  # position at the previous tick, for drawing
         self.radius = 15
         self.direction = "right"
         self.next_direction = "right"
         self.speed = PACMAN_SPEED
         self.mouth_open = True
         self.mouth_angle = 45
-        self.animation_counter = 0
         self.rotation = 0  # Rotation angle in degrees
         # Добавляем переменные для плавного поворота
         self.turning_point = None
         self.align_threshold = self.speed  # Порог для выравнивания по сетке
 
-        self.image = pygame.image.load('pacman.png')
-        self.image = pygame.transform.scale(self.image, (30, 30))
-        self.original_image = self.image.copy()
-        self.images = [
-            pygame.image.load("pacman.png"),
-            pygame.image.load("pacman_close.png")
-        ]
-        self.animation_index = 0
-        self.animation_timer = 0
-        self.image = self.images[self.animation_index]
+        self.animation_index = 0  # flipped by the Game's timers
 
-    def update(self, walls):
+        # Pre-rotated open and closed mouth frames, shared by every PacMan;
+        # looked up on the first draw so headless games never load images
+        self.frames = []
 
-        self.animation_timer += 1
+    def respawn(self, x, y):
+        # Start of a new life, reusing this object and its frames
+        self.x = x
+        self.y = y
+        self.prev_x, self.prev_y = x, y
+        self.direction = "right"
+        self.next_direction = "right"
+        self.mouth_open = True
+        self.rotation = 0
+        self.turning_point = None
+        self.animation_index = 0
 
+    def next_frame(self):
+        self.animation_index = (self.animation_index + 1) % 2
 
-        if self.animation_timer >= 5:
-            self.animation_index = (self.animation_index + 1) % len(self.images)
-            self.image = self.images[self.animation_index]
-            self.animation_timer = 0
+    def toggle_mouth(self):
+        self.mouth_open = not self.mouth_open
 
-        self.animation_counter += 1
-        if self.animation_counter >= 10:
-            self.mouth_open = not self.mouth_open
-            self.animation_counter = 0
+    def update(self, wall_grid):
+        self.prev_x, self.prev_y = self.x, self.y
 
         # Store current position to revert if collision occurs
         old_x, old_y = self.x, self.y
 
         # Получаем размер ячейки лабиринта
-        cell_width = SCREEN_WIDTH // len(LEVEL_LAYOUTS[0][0])
-        cell_height = SCREEN_HEIGHT // len(LEVEL_LAYOUTS[0])
+        cell_width = wall_grid.cell_width
+        cell_height = wall_grid.cell_height
 
         # Проверяем, можно ли повернуть в запрошенном направлении
         if self.next_direction != self.direction:
@@ -186,13 +268,7 @@ class PacMan:
                     test_rect = pygame.Rect(self.x - self.radius, test_y - self.radius,
                                             self.radius * 2, self.radius * 2)
 
-                    collision = False
-                    for wall in walls:
-                        if test_rect.colliderect(wall.rect):
-                            collision = True
-                            break
-
-                    if not collision:
+                    if not wall_grid.collides(test_rect):
                         self.direction = self.next_direction
 
             # Если Pac-Man движется вертикально и хочет повернуть горизонтально
@@ -211,13 +287,7 @@ class PacMan:
                     test_rect = pygame.Rect(test_x - self.radius, self.y - self.radius,
                                             self.radius * 2, self.radius * 2)
 
-                    collision = False
-                    for wall in walls:
-                        if test_rect.colliderect(wall.rect):
-                            collision = True
-                            break
-
-                    if not collision:
+                    if not wall_grid.collides(test_rect):
                         self.direction = self.next_direction
 
         # Move in the current direction
@@ -237,42 +307,29 @@ class PacMan:
         # Check for collision with walls
         pacman_rect = self.get_rect()
         collision_occurred = False
-        for wall in walls:
-            if pacman_rect.colliderect(wall.rect):
-                collision_occurred = True
-
-                # Пытаемся "скользить" вдоль стены вместо полной остановки
-                # Сначала пробуем сохранить движение по X
-                slide_x = True
-                self.y = old_y
-                slide_rect_x = pygame.Rect(self.x - self.radius, self.y - self.radius,
+        if wall_grid.collides(pacman_rect):
+            collision_occurred = True
+
+            # Пытаемся "скользить" вдоль стены вместо полной остановки
+            # Сначала пробуем сохранить движение по X
+            self.y = old_y
+            slide_rect_x = pygame.Rect(self.x - self.radius, self.y - self.radius,
+                                       self.radius * 2, self.radius * 2)
+            slide_x = not wall_grid.collides(slide_rect_x)
+
+            # Если скольжение по X невозможно, пробуем по Y
+            if not slide_x:
+                self.x = old_x
+                self.y = old_y + (
+                    self.speed if self.direction == "down" else -self.speed if self.direction == "up" else 0)
+
+                slide_rect_y = pygame.Rect(self.x - self.radius, self.y - self.radius,
                                            self.radius * 2, self.radius * 2)
+                slide_y = not wall_grid.collides(slide_rect_y)
 
-                for w in walls:
-                    if slide_rect_x.colliderect(w.rect):
-                        slide_x = False
-                        break
-
-                # Если скольжение по X невозможно, пробуем по Y
-                if not slide_x:
-                    slide_y = True
-                    self.x = old_x
-                    self.y = old_y + (
-                        self.speed if self.direction == "down" else -self.speed if self.direction == "up" else 0)
-
-                    slide_rect_y = pygame.Rect(self.x - self.radius, self.y - self.radius,
-                                               self.radius * 2, self.radius * 2)
-
-                    for w in walls:
-                        if slide_rect_y.colliderect(w.rect):
-                            slide_y = False
-                            break
-
-                    # Если и скольжение по Y невозможно, возвращаемся на старую позицию
-                    if not slide_y:
-                        self.x, self.y = old_x, old_y
-
-                break
+                # Если и скольжение по Y невозможно, возвращаемся на старую позицию
+                if not slide_y:
+                    self.x, self.y = old_x, old_y
 
         # В методе update() или move() класса Pacman:
 
@@ -305,13 +362,7 @@ class PacMan:
                 test_rect = pygame.Rect(test_x - self.radius, test_y - self.radius,
                                         self.radius * 2, self.radius * 2)
 
-                can_turn = True
-                for wall in walls:
-                    if test_rect.colliderect(wall.rect):
-                        can_turn = False
-                        break
-
-                if can_turn:
+                if not wall_grid.collides(test_rect):
                     self.direction = self.next_direction
                     self.x, self.y = test_x, test_y
 
@@ -325,7 +376,7 @@ class PacMan:
         elif self.y > SCREEN_HEIGHT:
             self.y = 0
 
-    def get_valid_direction(self, walls):
+    def get_valid_direction(self, wall_grid):
         # Return a valid direction if current direction causes collision
         directions = ["right", "left", "up", "down"]
         valid_directions = []
@@ -342,25 +393,24 @@ class PacMan:
                 test_y += self.speed
 
             test_rect = pygame.Rect(test_x - self.radius, test_y - self.radius, self.radius * 2, self.radius * 2)
-            collision = False
-            for wall in walls:
-                if test_rect.colliderect(wall.rect):
-                    collision = True
-                    break
-
-            if not collision:
+            if not wall_grid.collides(test_rect):
                 valid_directions.append(dir)
 
         if valid_directions:
             return valid_directions[0]  # Return first valid direction
         return self.direction  # If all directions cause collision, keep current
 
-    def draw(self):
-        # Rotate the image based on direction
-        rotated_image = pygame.transform.rotate(self.original_image, self.rotation)
+    def draw(self, alpha=1.0):
+        if not self.frames:
+            self.frames = [
+                rotated_frames('pacman.png', (30, 30)),
+                rotated_frames('pacman_close.png', (30, 30))
+            ]
+        # Pick the cached frame for the current direction and mouth state
+        rotated_image = frame_for_angle(self.frames[self.animation_index], self.rotation)
         # Get the rect of the rotated image and set its center to the pacman's position
-        rect = rotated_image.get_rect(center=(self.x, self.y))
-        screen.blit(rotated_image, rect.topleft)
+        rect = rotated_image.get_rect(center=lerp_position(self, alpha))
+        return screen.blit(rotated_image, rect.topleft)
 
     def get_rect(self):
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
@@ -369,37 +419,68 @@ class Wall:
     def __init__(self, x, y, width, height):
         self.rect = pygame.Rect(x, y, width, height)
 
-    def draw(self):
-        pygame.draw.rect(screen, WALL_COLOR, self.rect)
+    def draw(self, surface):
+        pygame.draw.rect(surface, WALL_COLOR, self.rect)
 
 class Ghost:
-    def __init__(self, x, y, color):
+    def __init__(self, x, y, color, rng):
         self.x = x
         self.y = y
+        self.prev_x, self.prev_y = x, y
         self.color = color
         self.radius = 15
-        self.direction = random.choice(["right", "left", "up", "down"])
+        self.rng = rng  # the Game's seeded RNG, so runs can be replayed
+        self.direction = self.rng.choice(["right", "left", "up", "down"])
         self.speed = GHOST_SPEED
-        self.change_direction_counter = 0
+        self.chasing = False
+        self.frightened = False
 
-        self.image = pygame.image.load('ghost.webp')
-        self.image = pygame.transform.scale(self.image, (30, 30))
+        self.image = None  # loaded on the first draw
 
-    def update(self, pacman, walls):
-        self.change_direction_counter += 1
-        if self.change_direction_counter >= 60:
-            if random.random() < 0.7:
-                dx = pacman.x - self.x
-                dy = pacman.y - self.y
+    def respawn(self, x, y):
+        self.x = x
+        self.y = y
+        self.prev_x, self.prev_y = x, y
+        self.direction = self.rng.choice(["right", "left", "up", "down"])
+        self.chasing = False
+        self.calm()
+
+    def decide(self):
+        # Called by the Game's timers every GHOST_DECISION_TICKS. 70% of the
+        # time follow the shortest path to Pac-Man, otherwise wander; a
+        # frightened ghost always wanders.
+        self.chasing = not self.frightened and self.rng.random() < CHASE_PROBABILITY
+        if not self.chasing:
+            self.direction = self.rng.choice(["right", "left", "up", "down"])
+
+    def frighten(self):
+        # Power pellet: slow down, stop chasing and turn back
+        self.frightened = True
+        self.chasing = False
+        self.speed = FRIGHTENED_SPEED
+        self.direction = {"right": "left", "left": "right", "up": "down", "down": "up"}[self.direction]
+
+    def calm(self):
+        self.frightened = False
+        self.speed = GHOST_SPEED
 
-                if abs(dx) > abs(dy):
-                    self.direction = "right" if dx > 0 else "left"
-                else:
-                    self.direction = "down" if dy > 0 else "up"
-            else:
-                self.direction = random.choice(["right", "left", "up", "down"])
+    def update(self, pacman, wall_grid, nav_grid):
+        self.prev_x, self.prev_y = self.x, self.y
+
+        if self.chasing:
+            cell_width = wall_grid.cell_width
+            cell_height = wall_grid.cell_height
+            col = self.x // cell_width
+            row = self.y // cell_height
+            center_x = col * cell_width + cell_width // 2
+            center_y = row * cell_height + cell_height // 2
 
-            self.change_direction_counter = 0
+            # Only turn in the middle of a cell, so the new direction is never into a wall
+            if abs(self.x - center_x) < self.speed and abs(self.y - center_y) < self.speed:
+                move = nav_grid.next_move(col, row, pacman.x // cell_width, pacman.y // cell_height)
+                if move and move != self.direction:
+                    self.x, self.y = center_x, center_y
+                    self.direction = move
 
         # Store current position to revert if collision occurs
         old_x, old_y = self.x, self.y
@@ -414,12 +495,9 @@ class Ghost:
             self.y += self.speed
 
         # Check for collision with walls
-        ghost_rect = self.get_rect()
-        for wall in walls:
-            if ghost_rect.colliderect(wall.rect):
-                self.x, self.y = old_x, old_y
-                self.direction = random.choice(["right", "left", "up", "down"])
-                break
+        if wall_grid.collides(self.get_rect()):
+            self.x, self.y = old_x, old_y
+            self.direction = self.rng.choice(["right", "left", "up", "down"])
 
         # Wrap around screen edges
         if self.x < 0:
@@ -431,8 +509,12 @@ class Ghost:
         elif self.y > SCREEN_HEIGHT:
             self.y = 0
 
-    def draw(self):
-        screen.blit(self.image, (self.x - 15, self.y - 15))
+    def draw(self, alpha=1.0):
+        if self.image is None:
+            self.image = load_image('ghost.webp', (30, 30))
+        image = silhouette('ghost.webp', (30, 30), BLUE) if self.frightened else self.image
+        x, y = lerp_position(self, alpha)
+        return screen.blit(image, (x - 15, y - 15))
 
     def get_rect(self):
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
@@ -444,18 +526,14 @@ class PowerPellet:
         self.y = y
         self.radius = DOT_SIZE
         self.collected = False
-        self.animation_counter = 0
 
-    def update(self):
-        self.animation_counter += 1
-        if self.animation_counter >= 30:
-            self.animation_counter = 0
-
-    def draw(self):
+    def draw(self, phase):
+        # phase: 0 to PELLET_PULSE_TICKS - 1, shared by every pellet on the level
         if not self.collected:
             # Pulsating effect
-            size_mod = abs(math.sin(self.animation_counter * 0.1)) * 2
-            pygame.draw.circle(screen, WHITE, (self.x, self.y), self.radius + size_mod)
+            size_mod = abs(math.sin(phase * 0.1)) * 2
+            return pygame.draw.circle(screen, WHITE, (self.x, self.y), self.radius + size_mod)
+        return None
 
     def get_rect(self):
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
@@ -468,29 +546,50 @@ class Dot:
         self.radius = DOT_SIZE // 2
         self.collected = False
 
-        self.image = pygame.image.load('dot.png')
-        self.image = pygame.transform.scale(self.image, (DOT_SIZE, DOT_SIZE))
+        self.image = None  # loaded on the first draw
 
-    def draw(self):
+    def draw(self, surface):
+        if self.image is None:
+            self.image = load_image('dot.png', (DOT_SIZE, DOT_SIZE))
         if not self.collected:
-            screen.blit(self.image, (self.x - self.radius, self.y - self.radius))
+            surface.blit(self.image, (self.x - self.radius, self.y - self.radius))
 
     def get_rect(self):
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
 
 
 class Game:
-    def __init__(self):
-        self.reset()
+    def __init__(self, seed=None, level=0):
+        # Static maze layers and the screen areas drawn over them last frame
+        self.wall_layer = None
+        self.dot_layer = None
+        self.dirty_rects = []
+        self.drawn_state = None
+        self.full_redraw = True
+        self.reset(seed, level)
+
+    def reset(self, seed=None, level=0):
+        # Every game gets its own seed; with the inputs in self.replay it
+        # reproduces the run exactly
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.replay = Replay(seed, level)
 
-    def reset(self):
         self.state = MENU
-        self.level = 0
+        self.level = level
         self.pacman = None
         self.ghosts = []
         self.dots = []
         self.power_pellets = []
         self.walls = []
+        self.wall_grid = None
+        self.dot_grid = None
+        self.ghost_hash = None
+        self.nav_grid = None
+        self.timers = TimerWheel()
+        self.ghosts_eaten = 0  # since the last power pellet
         self.score = 0
         self.lives = 3
         self.load_level(self.level)
@@ -502,51 +601,221 @@ class Game:
 
         self.dots = []
         self.power_pellets = []
-        self.walls = []
         self.ghosts = []
 
-        layout = LEVEL_LAYOUTS[level_index]
-        cell_width = SCREEN_WIDTH // len(layout[0])
-        cell_height = SCREEN_HEIGHT // len(layout)
+        # Walls, spawns, dot positions and path tables come precomputed
+        pack = get_level_pack(level_index)
+        self.wall_grid = pack.wall_grid
+        self.nav_grid = pack
+        self.dot_grid = DotGrid(pack.cols, pack.rows, pack.cell_width, pack.cell_height)
 
-        pacman_pos = None
-        ghost_positions = []
-
-        for y, row in enumerate(layout):
-            for x, cell in enumerate(row):
-                cell_x = x * cell_width + cell_width // 2
-                cell_y = y * cell_height + cell_height // 2
-
-                if cell == 1:  # Wall
-                    self.walls.append(Wall(x * cell_width, y * cell_height, cell_width, cell_height))
-                elif cell == 2:  # Dot
-                    self.dots.append(Dot(cell_x, cell_y))
-                elif cell == 3:  # Power Pellet
-                    self.power_pellets.append(PowerPellet(cell_x, cell_y))
-                elif cell == 4:  # Pacman start
-                    pacman_pos = (cell_x, cell_y)
-                elif cell >= 5 and cell <= 8:  # Ghost starts
-                    ghost_positions.append((cell_x, cell_y, cell - 5))
+        # Adjacent wall tiles come merged into a few large rects
+        self.walls = [Wall(*rect) for rect in pack.wall_rects]
+        for x, y in pack.dots:
+            self.dots.append(Dot(x, y))
+            self.dot_grid.add(self.dots[-1])
+        for x, y in pack.pellets:
+            self.power_pellets.append(PowerPellet(x, y))
+            self.dot_grid.add(self.power_pellets[-1])
+
+        pacman_pos = pack.pacman_spawn
+        ghost_positions = pack.ghost_spawns
 
         # Create Pacman
-        if pacman_pos:
-            self.pacman = PacMan(pacman_pos[0], pacman_pos[1])
-        else:
-            self.pacman = PacMan(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.pacman_spawn = pacman_pos or (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.pacman = PacMan(*self.pacman_spawn)
+        # A fresh Pac-Man faces right whatever was last recorded, so the next
+        # tick's direction has to be logged even if it matches
+        self.replay.last_direction = None
 
         # Create Ghosts
         ghost_colors = [RED, PINK, CYAN, ORANGE]
         for pos in ghost_positions:
-            self.ghosts.append(Ghost(pos[0], pos[1], ghost_colors[pos[2]]))
+            self.ghosts.append(Ghost(pos[0], pos[1], ghost_colors[pos[2]], self.rng))
 
         # If no ghosts defined in the layout, create default ones
         if not self.ghosts:
             self.ghosts = [
-                Ghost(100, 100, RED),
-                Ghost(SCREEN_WIDTH - 100, 100, PINK),
-                Ghost(100, SCREEN_HEIGHT - 100, CYAN),
-                Ghost(SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100, ORANGE)
+                Ghost(100, 100, RED, self.rng),
+                Ghost(SCREEN_WIDTH - 100, 100, PINK, self.rng),
+                Ghost(100, SCREEN_HEIGHT - 100, CYAN, self.rng),
+                Ghost(SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100, ORANGE, self.rng)
             ]
+        self.ghost_spawns = [(ghost.x, ghost.y) for ghost in self.ghosts]
+
+        self.index_ghosts()
+
+        # Timed effects start over on every level
+        self.timers = TimerWheel()
+        self.ghosts_eaten = 0
+        self.start_timers()
+
+        # The maze layers are drawn on the next full redraw
+        self.wall_layer = None
+        self.dot_layer = None
+        self.full_redraw = True
+
+    def respawn(self):
+        # After a lost life: the same Pac-Man and ghosts go back to their spawn
+        # cells with fresh per-life state; eaten dots and pellets stay eaten
+        self.pacman.respawn(*self.pacman_spawn)
+        self.replay.last_direction = None  # see load_level()
+        for ghost, (x, y) in zip(self.ghosts, self.ghost_spawns):
+            ghost.respawn(x, y)
+            self.ghost_hash.move(ghost)
+        self.timers.cancel("frightened_end")
+        self.start_timers()
+
+    def start_timers(self):
+        # The repeating per-life timers; each one sets itself again when it fires
+        self.timers.set("pacman_frame", PACMAN_FRAME_TICKS)
+        self.timers.set("pacman_mouth", PACMAN_MOUTH_TICKS)
+        for index in range(len(self.ghosts)):
+            self.timers.set(("ghost", index), GHOST_DECISION_TICKS)
+
+    def run_timers(self):
+        # Only the objects with something due this tick are touched
+        for key in self.timers.advance():
+            if key == "pacman_frame":
+                self.pacman.next_frame()
+                self.timers.set(key, PACMAN_FRAME_TICKS)
+            elif key == "pacman_mouth":
+                self.pacman.toggle_mouth()
+                self.timers.set(key, PACMAN_MOUTH_TICKS)
+            elif key == "frightened_end":
+                for ghost in self.ghosts:
+                    ghost.calm()
+            elif key == "next_level":
+                self.next_level()
+            else:
+                _, index = key  # ("ghost", index)
+                self.ghosts[index].decide()
+                self.timers.set(key, GHOST_DECISION_TICKS)
+
+    def frighten_ghosts(self):
+        # Another pellet while they are frightened starts the time over
+        self.ghosts_eaten = 0
+        for ghost in self.ghosts:
+            ghost.frighten()
+        self.timers.set("frightened_end", FRIGHTENED_TICKS)
+
+    def eat_ghost(self, index):
+        self.ghosts_eaten += 1
+        self.score += GHOST_POINTS * 2 ** (self.ghosts_eaten - 1)
+
+        # Straight back to its spawn cell, no longer frightened
+        ghost = self.ghosts[index]
+        ghost.respawn(*self.ghost_spawns[index])
+        self.ghost_hash.move(ghost)
+        self.timers.set(("ghost", index), GHOST_DECISION_TICKS)
+
+    def index_ghosts(self):
+        # Ghosts bucketed by maze cell, so collision checks only look nearby
+        self.ghost_hash = SpatialHash(self.wall_grid.cols, self.wall_grid.rows, self.wall_grid.cell_width,
+                                      self.wall_grid.cell_height, max(e.radius for e in self.ghosts + [self.pacman]))
+        for ghost in self.ghosts:
+            self.ghost_hash.insert(ghost)
+
+    def snapshot(self):
+        # Everything update() depends on, as plain values; see restore()
+        return GameRecord(
+            state=self.state,
+            level=self.level,
+            score=self.score,
+            lives=self.lives,
+            seed=self.seed,
+            rng_state=self.rng.getstate(),
+            dot_bits=self.dot_grid.bits,
+            pacman=PacManRecord.capture(self.pacman),
+            ghosts=tuple(GhostRecord.capture(ghost) for ghost in self.ghosts),
+            ghost_spawns=tuple(self.ghost_spawns),
+            timers=self.timers.state(),
+            ghosts_eaten=self.ghosts_eaten,
+            replay=(self.replay.ticks, len(self.replay.inputs), self.replay.last_direction),
+        )
+
+    def restore(self, snapshot):
+        # Puts the game back to a snapshot taken from this game (same seed).
+        # Ticks recorded since then are dropped from the replay, so play can
+        # branch from here.
+        if snapshot.seed != self.seed:
+            raise ValueError("snapshot is from a different game")
+
+        if snapshot.level != self.level:
+            self.level = snapshot.level
+            self.load_level(self.level)
+        self.state = snapshot.state
+        self.score = snapshot.score
+        self.lives = snapshot.lives
+        self.rng.setstate(snapshot.rng_state)
+
+        snapshot.pacman.apply(self.pacman)
+        if len(self.ghosts) != len(snapshot.ghosts):
+            self.ghosts = [Ghost(record.x, record.y, record.color, self.rng) for record in snapshot.ghosts]
+            self.rng.setstate(snapshot.rng_state)
+        for ghost, record in zip(self.ghosts, snapshot.ghosts):
+            record.apply(ghost)
+        # Spawns and the ("ghost", index) timers come from the snapshot too, so
+        # they always match the ghosts just restored
+        self.ghost_spawns = list(snapshot.ghost_spawns)
+        self.index_ghosts()
+
+        self.timers.load(snapshot.timers)
+        self.ghosts_eaten = snapshot.ghosts_eaten
+
+        dot_grid = self.dot_grid
+        if dot_grid.bits != snapshot.dot_bits:
+            dot_grid.bits = snapshot.dot_bits
+            dot_grid.remaining = bin(dot_grid.bits).count("1")
+            for index, item in dot_grid.items.items():
+                item.collected = not dot_grid.bits >> index & 1
+            # Dots may have come back, so their layer has to be redrawn
+            self.dot_layer = None
+            self.full_redraw = True
+
+        ticks, n_inputs, last_direction = snapshot.replay
+        del self.replay.inputs[n_inputs:]
+        self.replay.ticks = ticks
+        self.replay.last_direction = last_direction
+
+    def build_wall_layer(self):
+        # Walls don't move, so they are drawn once per level
+        self.wall_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.wall_layer.fill(BLACK)
+        for wall in self.walls:
+            wall.draw(self.wall_layer)
+        self.full_redraw = True
+
+    def build_dot_layer(self):
+        # Dots only ever disappear; black is see-through so the walls show under it
+        self.dot_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.dot_layer.fill(BLACK)
+        self.dot_layer.set_colorkey(BLACK)
+        for dot in self.dots:
+            dot.draw(self.dot_layer)
+        self.full_redraw = True
+
+    def draw_maze(self, rect=None):
+        # Walls, then dots, over the whole screen or just rect
+        with profiler.section("walls"):
+            if self.wall_layer is None:
+                self.build_wall_layer()
+            if rect is None:
+                screen.blit(self.wall_layer, (0, 0))
+            else:
+                screen.blit(self.wall_layer, rect, rect)
+        with profiler.section("dots"):
+            if self.dot_layer is None:
+                self.build_dot_layer()
+            if rect is None:
+                screen.blit(self.dot_layer, (0, 0))
+            else:
+                screen.blit(self.dot_layer, rect, rect)
+
+    def erase_dot(self, dot):
+        if self.dot_layer is not None:
+            self.dot_layer.fill(BLACK, dot.get_rect())
+            self.dirty_rects.append(dot.get_rect())
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -555,6 +824,10 @@ class Game:
                 sys.exit()
 
             if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                    self.full_redraw = True  # the overlay may leave a static screen
+
                 if self.state == MENU:
                     if event.key == pygame.K_SPACE:
                         self.state = PLAYING
@@ -563,9 +836,7 @@ class Game:
                         self.reset()
                 elif self.state == LEVEL_COMPLETE:
                     if event.key == pygame.K_SPACE:
-                        self.level += 1
-                        self.load_level(self.level)
-                        self.state = PLAYING
+                        self.next_level()
                 elif self.state == PLAYING:
                     if event.key == pygame.K_RIGHT:
                         self.pacman.next_direction = "right"
@@ -576,96 +847,165 @@ class Game:
                     elif event.key == pygame.K_DOWN:
                         self.pacman.next_direction = "down"
 
-    def update(self):
-        if self.state == PLAYING:
-            self.pacman.update(self.walls)
+    def next_level(self):
+        self.level += 1
+        self.load_level(self.level)
+        if self.state != WIN:
+            self.state = PLAYING
 
-            for ghost in self.ghosts:
-                ghost.update(self.pacman, self.walls)
+    def step(self, direction=None):
+        # One logic tick driven by a command instead of keyboard events.
+        # Presses SPACE for the caller on the menu and between levels,
+        # so a bot only has to send "right"/"left"/"up"/"down" or None.
+        if self.state == MENU:
+            self.state = PLAYING
+        elif self.state == LEVEL_COMPLETE:
+            self.next_level()
 
-                if self.pacman.get_rect().colliderect(ghost.get_rect()):
-                    self.lives -= 1
-                    if self.lives <= 0:
-                        self.state = GAME_OVER
-                    else:
-                        # Reset positions but keep the level
-                        self.load_level(self.level)
-                        break
+        if self.state == PLAYING and direction is not None:
+            self.pacman.next_direction = direction
 
-            for dot in self.dots:
-                if not dot.collected and self.pacman.get_rect().colliderect(dot.get_rect()):
-                    dot.collected = True
-                    self.score += SCORE_PER_DOT
+        self.update()
+        return self.state
 
-            for pellet in self.power_pellets:
-                if not pellet.collected and self.pacman.get_rect().colliderect(pellet.get_rect()):
-                    pellet.collected = True
-                    self.score += SCORE_PER_DOT * 5
-                    # TODO: Make ghosts vulnerable
+    def update(self):
+        if self.state == LEVEL_COMPLETE:
+            # Only the delay before the next level is pending
+            self.run_timers()
+
+        elif self.state == PLAYING:
+            self.replay.record(self.pacman.next_direction)
+            with profiler.section("timers"):
+                self.run_timers()
+
+            with profiler.section("pacman"):
+                self.pacman.update(self.wall_grid)
+
+            with profiler.section("ghost_ai"):
+                for ghost in self.ghosts:
+                    ghost.update(self.pacman, self.wall_grid, self.nav_grid)
+                    self.ghost_hash.move(ghost)
+
+            with profiler.section("collisions"):
+                # Only ghosts in the buckets around Pac-Man can be touching him
+                touching = set(self.ghost_hash.overlapping(self.pacman))
+                caught = False
+                if touching:
+                    # In ghost order, so the RNG is drawn from the same way on every run
+                    for index, ghost in enumerate(self.ghosts):
+                        if ghost in touching:
+                            if ghost.frightened:
+                                self.eat_ghost(index)
+                            else:
+                                caught = True
+            if caught:
+                self.lives -= 1
+                if self.lives <= 0:
+                    self.state = GAME_OVER
+                else:
+                    self.respawn()
+
+            with profiler.section("collisions"):
+                for item in self.dot_grid.collect(self.pacman.get_rect()):
+                    if isinstance(item, PowerPellet):
+                        self.score += SCORE_PER_DOT * 5
+                        self.frighten_ghosts()
+                    else:
+                        self.score += SCORE_PER_DOT
+                        self.erase_dot(item)
 
             # Check if all dots and power pellets are collected
-            if all(dot.collected for dot in self.dots) and all(pellet.collected for pellet in self.power_pellets):
+            if self.dot_grid.remaining == 0:
                 if self.level < len(LEVEL_LAYOUTS) - 1:
                     self.state = LEVEL_COMPLETE
+                    self.timers.clear()
+                    self.timers.set("next_level", LEVEL_COMPLETE_TICKS)
                 else:
                     self.state = WIN
 
-    def draw(self):
+    def draw_sprites(self, alpha=1.0):
+        # Everything that can change within a level; returns the screen rects it covered
+        rects = []
+        with profiler.section("pellets"):
+            phase = self.timers.now % PELLET_PULSE_TICKS
+            for pellet in self.power_pellets:
+                rect = pellet.draw(phase)
+                if rect:
+                    rects.append(rect)
+
+        with profiler.section("sprites"):
+            rects.append(self.pacman.draw(alpha))
+
+            for ghost in self.ghosts:
+                rects.append(ghost.draw(alpha))
+
+        with profiler.section("hud"):
+            score_text = render_text(f"Score: {self.score}", WHITE, 36)
+            rects.append(screen.blit(score_text, (10, 10)))
+
+            lives_text = render_text(f"Lives: {self.lives}", WHITE, 36)
+            rects.append(screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 10, 10)))
+
+            level_text = render_text(f"Level: {self.level + 1}", WHITE, 36)
+            rects.append(screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, 10)))
+
+            if profiler.show_overlay:
+                rects.extend(self.draw_profile_overlay())
+        return rects
+
+    def draw_profile_overlay(self):
+        # Rolling frame-time percentiles under the score
+        rects = []
+        y = 50
+        for line in profiler.overlay_lines:
+            text = render_text(line, GREEN, 20, "monospace")
+            rects.append(screen.blit(text, (10, y)))
+            y += text.get_height()
+        return rects
+
+    def draw(self, alpha=1.0):
+        # alpha: how far the frame is between the previous logic tick and the current one
+        if self.state == PLAYING and self.drawn_state == PLAYING and not self.full_redraw:
+            # Put the maze back under last frame's sprites, draw them at their
+            # new places and push only those areas to the display
+            for rect in self.dirty_rects:
+                self.draw_maze(rect)
+            rects = self.draw_sprites(alpha)
+            with profiler.section("flip"):
+                pygame.display.update(self.dirty_rects + rects)
+            self.dirty_rects = rects
+            return
+
+        if self.state == self.drawn_state and not self.full_redraw:
+            # Menu and overlay screens don't change until the state does
+            return
+
         screen.fill(BLACK)
 
         if self.state == MENU:
-            font = pygame.font.SysFont(None, 72)
-            title = font.render("PAC-MAN", True, YELLOW)
+            title = render_text("PAC-MAN", YELLOW, 72)
             screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, SCREEN_HEIGHT // 3))
 
-            font = pygame.font.SysFont(None, 36)
-            instruction = font.render("Press SPACE to start", True, WHITE)
+            instruction = render_text("Press SPACE to start", WHITE, 36)
             screen.blit(instruction, (SCREEN_WIDTH // 2 - instruction.get_width() // 2, SCREEN_HEIGHT // 2))
 
         elif self.state == PLAYING or self.state == GAME_OVER or self.state == LEVEL_COMPLETE or self.state == WIN:
-            # Draw walls
-            for wall in self.walls:
-                wall.draw()
-
-            # Draw dots
-            for dot in self.dots:
-                dot.draw()
-
-            # Draw power pellets
-            for pellet in self.power_pellets:
-                pellet.update()
-                pellet.draw()
-
-            self.pacman.draw()
-
-            for ghost in self.ghosts:
-                ghost.draw()
-
-            font = pygame.font.SysFont(None, 36)
-            score_text = font.render(f"Score: {self.score}", True, WHITE)
-            screen.blit(score_text, (10, 10))
-
-            lives_text = font.render(f"Lives: {self.lives}", True, WHITE)
-            screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 10, 10))
-
-            level_text = font.render(f"Level: {self.level + 1}", True, WHITE)
-            screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, 10))
+            # Walls and dots come from the pre-rendered maze layers
+            self.draw_maze()
+            self.dirty_rects = self.draw_sprites(alpha)
 
             if self.state == GAME_OVER:
                 overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
                 overlay.fill((0, 0, 0, 128))
                 screen.blit(overlay, (0, 0))
 
-                font = pygame.font.SysFont(None, 72)
-                game_over = font.render("GAME OVER", True, RED)
+                game_over = render_text("GAME OVER", RED, 72)
                 screen.blit(game_over, (SCREEN_WIDTH // 2 - game_over.get_width() // 2, SCREEN_HEIGHT // 3))
 
-                font = pygame.font.SysFont(None, 48)
-                final_score = font.render(f"Final Score: {self.score}", True, WHITE)
+                final_score = render_text(f"Final Score: {self.score}", WHITE, 48)
                 screen.blit(final_score, (SCREEN_WIDTH // 2 - final_score.get_width() // 2, SCREEN_HEIGHT // 2))
 
-                font = pygame.font.SysFont(None, 36)
-                restart = font.render("Press SPACE to restart", True, WHITE)
+                restart = render_text("Press SPACE to restart", WHITE, 36)
                 screen.blit(restart, (SCREEN_WIDTH // 2 - restart.get_width() // 2, SCREEN_HEIGHT // 2 + 60))
 
 
@@ -674,16 +1014,13 @@ class Game:
                 overlay.fill((0, 0, 0, 128))
                 screen.blit(overlay, (0, 0))
 
-                font = pygame.font.SysFont(None, 72)
-                win_text = font.render("YOU WIN!", True, GREEN)
+                win_text = render_text("YOU WIN!", GREEN, 72)
                 screen.blit(win_text, (SCREEN_WIDTH // 2 - win_text.get_width() // 2, SCREEN_HEIGHT // 3))
 
-                font = pygame.font.SysFont(None, 48)
-                final_score = font.render(f"Final Score: {self.score}", True, WHITE)
+                final_score = render_text(f"Final Score: {self.score}", WHITE, 48)
                 screen.blit(final_score, (SCREEN_WIDTH // 2 - final_score.get_width() // 2, SCREEN_HEIGHT // 2))
 
-                font = pygame.font.SysFont(None, 36)
-                restart = font.render("Press SPACE to restart", True, WHITE)
+                restart = render_text("Press SPACE to restart", WHITE, 36)
                 screen.blit(restart, (SCREEN_WIDTH // 2 - restart.get_width() // 2, SCREEN_HEIGHT // 2 + 60))
 
             elif self.state == LEVEL_COMPLETE:
@@ -691,30 +1028,72 @@ class Game:
                 overlay.fill((0, 0, 0, 128))
                 screen.blit(overlay, (0, 0))
 
-                font = pygame.font.SysFont(None, 72)
-                level_complete = font.render(f"LEVEL {self.level + 1} COMPLETE!", True, GREEN)
+                level_complete = render_text(f"LEVEL {self.level + 1} COMPLETE!", GREEN, 72)
                 screen.blit(level_complete, (SCREEN_WIDTH // 2 - level_complete.get_width() // 2, SCREEN_HEIGHT // 3))
 
-                font = pygame.font.SysFont(None, 48)
-                current_score = font.render(f"Score: {self.score}", True, WHITE)
+                current_score = render_text(f"Score: {self.score}", WHITE, 48)
                 screen.blit(current_score, (SCREEN_WIDTH // 2 - current_score.get_width() // 2, SCREEN_HEIGHT // 2))
 
-                font = pygame.font.SysFont(None, 36)
-                next_level = font.render("Press SPACE for next level", True, WHITE)
+                next_level = render_text("Press SPACE for next level", WHITE, 36)
                 screen.blit(next_level, (SCREEN_WIDTH // 2 - next_level.get_width() // 2, SCREEN_HEIGHT // 2 + 60))
 
-        pygame.display.flip()
+        with profiler.section("flip"):
+            pygame.display.flip()
+        self.drawn_state = self.state
+        self.full_redraw = False
+
+
+def save_replay(replay):
+    # PACMAN_REPLAY_DIR=path keeps a replay of every game, including ones that crashed
+    replay_dir = os.environ.get("PACMAN_REPLAY_DIR")
+    if replay_dir and replay.ticks:
+        os.makedirs(replay_dir, exist_ok=True)
+        replay.save(os.path.join(replay_dir, f"{replay.seed}.pmr"))
 
 
 def main():
+    init_engine()
+    preload(SPRITES)
+    clock = pygame.time.Clock()
     game = Game()
+    replay = game.replay
+    # One snapshot per PLAYING tick; holding BACKSPACE steps back through them
+    history = RewindBuffer(REWIND_TICKS)
 
+    trace_path = os.environ.get("PACMAN_PROFILE_TRACE")
+    if trace_path:
+        profiler.start_trace(trace_path)
+
+    timestep = FixedTimestep()
     running = True
-    while running:
-        game.handle_events()
-        game.update()
-        game.draw()
-        clock.tick(60)
+    try:
+        while running:
+            elapsed = clock.tick(RENDER_FPS) / 1000
+            profiler.begin_frame()
+            with profiler.section("events"):
+                game.handle_events()
+            if game.replay is not replay:  # SPACE after the game ended started a new one
+                save_replay(replay)
+                replay = game.replay
+                history.clear()
+
+            keys = pygame.key.get_pressed()
+            timestep.time_scale = FAST_FORWARD if keys[pygame.K_TAB] else 1
+            rewinding = keys[pygame.K_BACKSPACE] and game.state == PLAYING
+            for _ in range(timestep.advance(elapsed)):
+                if rewinding:
+                    if len(history) > 1:
+                        game.restore(history.rewind(2))
+                else:
+                    game.update()
+                    if game.state == PLAYING:
+                        history.push(game.snapshot())
+            if timestep.should_draw():
+                game.draw(timestep.alpha)
+            profiler.end_frame()
+    finally:
+        save_replay(game.replay)
+        profiler.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+# Mazes written as text, one string per row and one character per cell:
+#   #      wall
+#   .      dot
+#   -      ghost-house gate: a wall for Pac-Man, open for ghosts
+#   P      Pac-Man's start
+#   G      a ghost's start
+#   space  empty corridor
+# AsciiLevel compiles the strings once into the int layouts maze_grid works
+# on, so collisions and pickups are cell lookups instead of scans.
+from maze_grid import DIRECTION_STEPS, WALL, WallGrid
+
+EMPTY = 0
+GATE = 2
+
+OPPOSITE = {"right": "left", "left": "right", "up": "down", "down": "up"}
+
+
+class AsciiLevel:
+    def __init__(self, lines, cell_size):
+        self.rows = len(lines)
+        self.cols = len(lines[0]) if lines else 0
+        if not self.cols:
+            raise ValueError("empty maze")
+        self.cell_size = cell_size
+        self.width = self.cols * cell_size
+        self.height = self.rows * cell_size
+
+        self.layout = []  # WALL, GATE or EMPTY per cell
+        self.dot_cells = []  # (col, row) of every dot
+        self.pacman_spawn = None  # (col, row)
+        self.ghost_spawns = []  # (col, row), in the order they appear
+        for row, line in enumerate(lines):
+            if len(line) != self.cols:
+                raise ValueError(f"row {row} is {len(line)} cells wide, expected {self.cols}")
+            cells = []
+            for col, char in enumerate(line):
+                if char == "#":
+                    cells.append(WALL)
+                elif char == "-":
+                    cells.append(GATE)
+                elif char in ".PG ":
+                    cells.append(EMPTY)
+                    if char == ".":
+                        self.dot_cells.append((col, row))
+                    elif char == "P":
+                        self.pacman_spawn = (col, row)
+                    elif char == "G":
+                        self.ghost_spawns.append((col, row))
+                else:
+                    raise ValueError(f"unknown maze character {char!r} at row {row}, column {col}")
+            self.layout.append(cells)
+        if self.pacman_spawn is None:
+            raise ValueError("maze has no Pac-Man start (P)")
+
+        # Pac-Man can't pass the gate, ghosts can
+        self.walls = WallGrid([[WALL if cell == GATE else cell for cell in row] for row in self.layout],
+                              cell_size, cell_size)
+        self.ghost_walls = WallGrid(self.layout, cell_size, cell_size)
+
+    def cell_of(self, x, y):
+        return int(x) // self.cell_size % self.cols, int(y) // self.cell_size % self.rows
+
+    def centre(self, col, row):
+        return col * self.cell_size + self.cell_size // 2, row * self.cell_size + self.cell_size // 2
+
+    def is_open(self, walls, col, row, direction):
+        # Whether the cell next to (col, row) in `direction` is free; the maze
+        # wraps around, so tunnels at the edges lead to the other side
+        step_x, step_y = DIRECTION_STEPS[direction]
+        return not walls.cells[(row + step_y) % self.rows][(col + step_x) % self.cols]
+
+    def open_directions(self, walls, col, row):
+        return [direction for direction in DIRECTION_STEPS if self.is_open(walls, col, row, direction)]
+
+    def wrap(self, entity):
+        entity.x %= self.width
+        entity.y %= self.height
+
+    def move(self, entity, walls):
+        # Moves entity.speed pixels along the maze. Turns only happen on cell
+        # centres: there entity.choose_direction(open_directions) picks the
+        # next direction, or None to stop.
+        moved = 0
+        while moved < entity.speed:
+            col, row = self.cell_of(entity.x, entity.y)
+            centre_x, centre_y = self.centre(col, row)
+            step_x, step_y = DIRECTION_STEPS[entity.direction]
+            # Pixels to the centre of this cell along the direction; negative once past it
+            ahead = (centre_x - entity.x) * step_x + (centre_y - entity.y) * step_y
+
+            if ahead == 0:
+                direction = entity.choose_direction(self.open_directions(walls, col, row))
+                if direction is None:
+                    break
+                entity.direction = direction
+                step_x, step_y = DIRECTION_STEPS[direction]
+                step = entity.speed - moved
+            elif ahead > 0:
+                step = min(entity.speed - moved, ahead)
+            else:
+                step = entity.speed - moved
+
+            entity.x += step * step_x
+            entity.y += step * step_y
+            moved += step
+            self.wrap(entity)
@@ -0,0 +1,94 @@
+# Shared image registry: every file is decoded and scaled once per process,
+# and all sprites using it get the same Surface (so never draw onto one).
+from collections import OrderedDict
+
+import pygame
+
+_images = {}
+
+
+def load_image(path, size=None):
+    key = (path, size)
+    image = _images.get(key)
+    if image is None:
+        image = pygame.image.load(path)
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        # Match the display pixel format once, so blits don't convert every frame
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        _images[key] = image
+    return image
+
+
+def silhouette(path, size, color):
+    # The image's shape in a single colour (e.g. frightened ghosts), cached like load_image
+    key = (path, size, color)
+    image = _images.get(key)
+    if image is None:
+        image = load_image(path, size).copy()
+        image.fill((0, 0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        image.fill(color, special_flags=pygame.BLEND_RGB_ADD)
+        _images[key] = image
+    return image
+
+
+def preload(images):
+    # images: (path, size) pairs, loaded up front so the first level has no hitch
+    for path, size in images:
+        load_image(path, size)
+
+
+# Default angle between two pre-rotated frames, in degrees
+ROTATION_STEP = 5
+_rotations = {}
+
+
+def rotated_frames(path, size=None, step=ROTATION_STEP):
+    # Every rotation of the image, `step` degrees apart, built on first use
+    if 360 % step:
+        raise ValueError(f"rotation step must divide 360, got {step}")
+
+    key = (path, size, step)
+    frames = _rotations.get(key)
+    if frames is None:
+        image = load_image(path, size)
+        frames = [pygame.transform.rotate(image, angle) for angle in range(0, 360, step)]
+        _rotations[key] = frames
+    return frames
+
+
+def frame_for_angle(frames, angle):
+    # Nearest pre-rotated frame; any angle works, including negative or > 360
+    return frames[round(angle * len(frames) / 360) % len(frames)]
+
+
+# Fonts are looked up once; rendered text is kept for the most recent strings,
+# so a HUD value is only re-rendered when it actually changes
+TEXT_CACHE_SIZE = 256
+_fonts = {}
+_texts = OrderedDict()
+
+
+def get_font(size, name=None):
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(text, color, size, name=None):
+    key = (name, size, text, color)
+    surface = _texts.get(key)
+    if surface is None:
+        surface = get_font(size, name).render(text, True, color)
+        _texts[key] = surface
+        if len(_texts) > TEXT_CACHE_SIZE:
+            _texts.popitem(last=False)
+    else:
+        _texts.move_to_end(key)
+    return surface
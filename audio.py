@@ -0,0 +1,57 @@
+# Background music that never blocks the game loop. Tracks are started and
+# chained through pygame's music end event, so the window opens and the game
+# runs while an intro is still playing.
+#
+#     music = Music()
+#     music.play("intro.mp3", then="loop.mp3")   # intro once, then loop forever
+#     ...
+#     for event in pygame.event.get():
+#         music.handle_event(event)
+import sys
+
+import pygame
+
+MUSIC_END = pygame.USEREVENT + 1
+
+
+class Music:
+    def __init__(self):
+        self.next_track = None  # looped once the current track ends
+
+    @property
+    def enabled(self):
+        # No audio device (or mixer never initialised): stay silent instead of crashing
+        return pygame.mixer.get_init() is not None
+
+    def load(self, track):
+        # Loads `track` without starting it; False if it can't be played
+        if not self.enabled:
+            return False
+        try:
+            pygame.mixer.music.load(track)
+        except pygame.error as error:
+            # Music is optional; a missing track shouldn't stop the game
+            print(f"Can't play {track}: {error}", file=sys.stderr)
+            return False
+        return True
+
+    def play(self, track, then=None):
+        # Plays `track` once and then loops `then`, or loops `track` if there is no `then`
+        self.next_track = then
+        if not self.load(track):
+            return
+        if then is None:
+            pygame.mixer.music.set_endevent()
+            pygame.mixer.music.play(-1)
+        else:
+            pygame.mixer.music.set_endevent(MUSIC_END)
+            pygame.mixer.music.play()
+
+    def handle_event(self, event):
+        if event.type == MUSIC_END and self.next_track is not None:
+            self.play(self.next_track)
+
+    def stop(self):
+        self.next_track = None
+        if self.enabled:
+            pygame.mixer.music.stop()
@@ -0,0 +1,414 @@
+# Batch simulator: N independent RAIDACODEZDES.py games stepped together with NumPy.
+# Mirrors PacMan.update, Ghost.update (including the NavGrid chase) and the
+# dot/ghost checks in Game.update, including frightened ghosts after a power
+# pellet, but keeps every game in arrays so one step() advances all of them
+# at once. Game's timer wheel becomes a per-game countdown here.
+# Speeds and the ghost chase probability are per game, for parameter sweeps.
+import sys
+import time
+
+import numpy as np
+
+from RAIDACODEZDES import (
+    CHASE_PROBABILITY, DOT_SIZE, FRIGHTENED_SPEED, FRIGHTENED_TICKS, GAME_OVER, GHOST_DECISION_TICKS, GHOST_POINTS,
+    GHOST_SPEED, LEVEL_COMPLETE, LEVEL_LAYOUTS, PACMAN_SPEED, PLAYING, SCORE_PER_DOT, SCREEN_HEIGHT, SCREEN_WIDTH,
+    WIN,
+)
+from maze_grid import DIRECTIONS, NavGrid
+
+# Direction codes index DIRECTIONS, the same order Ghost uses for random.choice
+RIGHT, LEFT, UP, DOWN = range(4)
+NO_ACTION = -1
+
+DX = np.array([1, -1, 0, 0])
+DY = np.array([0, 0, -1, 1])
+REVERSE = np.array([LEFT, RIGHT, DOWN, UP])
+
+RADIUS = 15
+DOT_RADIUS = DOT_SIZE // 2
+PELLET_RADIUS = DOT_SIZE
+START_LIVES = 3
+
+
+class BatchSim:
+    def __init__(self, n_games, pacman_speed=PACMAN_SPEED, ghost_speed=GHOST_SPEED,
+                 chase_probability=CHASE_PROBABILITY, seed=None, layouts=LEVEL_LAYOUTS):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+
+        self.pacman_speed = np.broadcast_to(np.asarray(pacman_speed, dtype=np.int64), (n_games,)).copy()
+        self.ghost_speed = np.broadcast_to(np.asarray(ghost_speed, dtype=np.int64), (n_games,)).copy()
+        self.chase_probability = np.broadcast_to(
+            np.asarray(chase_probability, dtype=np.float64), (n_games,)).copy()
+
+        self._compile_levels(layouts)
+
+        n = n_games
+        self.state = np.full(n, PLAYING, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.full(n, START_LIVES, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+        self.pacman_x = np.zeros(n, dtype=np.int64)
+        self.pacman_y = np.zeros(n, dtype=np.int64)
+        self.pacman_dir = np.zeros(n, dtype=np.int64)
+        self.pacman_next_dir = np.zeros(n, dtype=np.int64)
+
+        g = self.n_ghosts
+        self.ghost_x = np.zeros((n, g), dtype=np.int64)
+        self.ghost_y = np.zeros((n, g), dtype=np.int64)
+        self.ghost_dir = np.zeros((n, g), dtype=np.int64)
+        self.ghost_counter = np.zeros((n, g), dtype=np.int64)
+        self.ghost_chasing = np.zeros((n, g), dtype=bool)
+        self.ghost_frightened = np.zeros((n, g), dtype=bool)
+        self.frightened_left = np.zeros(n, dtype=np.int64)  # ticks until the ghosts calm down
+        self.ghosts_eaten = np.zeros(n, dtype=np.int64)  # since the last power pellet
+
+        self.dots = np.zeros((n, self.rows, self.cols), dtype=bool)
+        self.pellets = np.zeros((n, self.rows, self.cols), dtype=bool)
+        self.remaining = np.zeros(n, dtype=np.int64)
+
+        self._load_level(np.ones(n, dtype=bool))
+
+    def _compile_levels(self, layouts):
+        grids = np.array(layouts, dtype=np.int64)
+        self.n_levels, self.rows, self.cols = grids.shape
+        self.cell_width = SCREEN_WIDTH // self.cols
+        self.cell_height = SCREEN_HEIGHT // self.rows
+
+        self.walls = grids == 1
+        self.level_dots = grids == 2
+        self.level_pellets = grids == 3
+        self.level_remaining = self.level_dots.sum(axis=(1, 2)) + self.level_pellets.sum(axis=(1, 2))
+
+        # next_moves[level, from_cell, target_cell] is the first step of the
+        # shortest path as a direction code, -1 where there is none
+        cells = self.rows * self.cols
+        self.next_moves = np.full((self.n_levels, cells, cells), -1, dtype=np.int8)
+        for level, layout in enumerate(layouts):
+            nav_grid = NavGrid(layout)
+            for target in range(cells):
+                moves = nav_grid.next_moves(target % self.cols, target // self.cols)
+                self.next_moves[level, :, target] = [
+                    DIRECTIONS.index(move) if move else -1 for move in moves
+                ]
+
+        pacman_spawns = []
+        ghost_spawns = []
+        for layout in layouts:
+            pacman_pos = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+            ghost_positions = []
+            for row, line in enumerate(layout):
+                for col, cell in enumerate(line):
+                    center = self.cell_center(col, row)
+                    if cell == 4:
+                        pacman_pos = center
+                    elif 5 <= cell <= 8:
+                        ghost_positions.append(center)
+            if not ghost_positions:
+                ghost_positions = [
+                    (100, 100),
+                    (SCREEN_WIDTH - 100, 100),
+                    (100, SCREEN_HEIGHT - 100),
+                    (SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100),
+                ]
+            pacman_spawns.append(pacman_pos)
+            ghost_spawns.append(ghost_positions)
+
+        if len({len(positions) for positions in ghost_spawns}) != 1:
+            raise ValueError("BatchSim needs the same number of ghosts on every level")
+
+        self.n_ghosts = len(ghost_spawns[0])
+        self.pacman_spawn = np.array(pacman_spawns, dtype=np.int64)
+        self.ghost_spawn = np.array(ghost_spawns, dtype=np.int64)
+
+    def cell_center(self, col, row):
+        return col * self.cell_width + self.cell_width // 2, row * self.cell_height + self.cell_height // 2
+
+    def _load_level(self, mask):
+        # Game.load_level for the games selected by mask
+        if not mask.any():
+            return
+        self._respawn(mask)
+
+        level = self.level[mask]
+        self.dots[mask] = self.level_dots[level]
+        self.pellets[mask] = self.level_pellets[level]
+        self.remaining[mask] = self.level_remaining[level]
+
+    def _respawn(self, mask):
+        # Game.respawn: everyone back to their spawn cells, dots stay as they are
+        level = self.level[mask]
+        k = len(level)
+
+        self.pacman_x[mask] = self.pacman_spawn[level, 0]
+        self.pacman_y[mask] = self.pacman_spawn[level, 1]
+        self.pacman_dir[mask] = RIGHT
+        self.pacman_next_dir[mask] = RIGHT
+
+        self.ghost_x[mask] = self.ghost_spawn[level, :, 0]
+        self.ghost_y[mask] = self.ghost_spawn[level, :, 1]
+        self.ghost_dir[mask] = self.rng.integers(0, 4, (k, self.n_ghosts))
+        self.ghost_counter[mask] = 0
+        self.ghost_chasing[mask] = False
+        self.ghost_frightened[mask] = False
+        self.frightened_left[mask] = 0
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.n_games, dtype=bool)
+        self.state[mask] = PLAYING
+        self.level[mask] = 0
+        self.score[mask] = 0
+        self.lives[mask] = START_LIVES
+        self.ticks[mask] = 0
+        self._load_level(mask)
+
+    def hits_wall(self, level, x, y):
+        # WallGrid.collides for a (2 * RADIUS)-sized rect centred on (x, y).
+        # A 30x30 rect never spans more than 2x2 cells of the 40x30 grid.
+        left = x - RADIUS
+        top = y - RADIUS
+        first_col = left // self.cell_width
+        last_col = (left + 2 * RADIUS - 1) // self.cell_width
+        first_row = top // self.cell_height
+        last_row = (top + 2 * RADIUS - 1) // self.cell_height
+
+        hit = np.zeros(np.broadcast(level, x, y).shape, dtype=bool)
+        for col in (first_col, last_col):
+            col_inside = (col >= 0) & (col < self.cols)
+            col = np.clip(col, 0, self.cols - 1)
+            for row in (first_row, last_row):
+                inside = col_inside & (row >= 0) & (row < self.rows)
+                hit |= inside & self.walls[level, np.clip(row, 0, self.rows - 1), col]
+        return hit
+
+    def step(self, actions=None):
+        # actions: per-game direction codes (RIGHT/LEFT/UP/DOWN) or NO_ACTION.
+        # Returns the per-game score gained this tick.
+        advancing = self.state == LEVEL_COMPLETE
+        if advancing.any():
+            self.level[advancing] += 1
+            self.state[advancing] = PLAYING
+            self._load_level(advancing)
+
+        active = self.state == PLAYING
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            steer = active & (actions != NO_ACTION)
+            self.pacman_next_dir[steer] = actions[steer]
+
+        score_before = self.score.copy()
+        self.ticks[active] += 1
+
+        # The frightened_end timer of Game.run_timers
+        counting = active & (self.frightened_left > 0)
+        self.frightened_left[counting] -= 1
+        calm = counting & (self.frightened_left == 0)
+        self.ghost_frightened[calm] = False
+
+        self._update_pacman(active)
+        self._update_ghosts(active)
+        self._check_ghost_hits(active)
+        self._collect_dots(active)
+
+        cleared = (self.state == PLAYING) & (self.remaining == 0)
+        last_level = self.level >= self.n_levels - 1
+        self.state[cleared & ~last_level] = LEVEL_COMPLETE
+        self.state[cleared & last_level] = WIN
+
+        return self.score - score_before
+
+    def _update_pacman(self, active):
+        x, y = self.pacman_x, self.pacman_y
+        d, nd = self.pacman_dir, self.pacman_next_dir
+        speed = self.pacman_speed
+        level = self.level
+        old_x, old_y = x.copy(), y.copy()
+
+        # Turn at a cell centre, snapping onto it like PacMan.update does
+        turning = nd != d
+        horizontal = d < UP
+        next_horizontal = nd < UP
+        center_x = (np.round(x / self.cell_width) * self.cell_width).astype(np.int64) + self.cell_width // 2
+        center_y = (np.round(y / self.cell_height) * self.cell_height).astype(np.int64) + self.cell_height // 2
+        snap_x = turning & horizontal & ~next_horizontal & (np.abs(x - center_x) < speed)
+        snap_y = turning & ~horizontal & next_horizontal & (np.abs(y - center_y) < speed)
+        x = np.where(snap_x, center_x, x)
+        y = np.where(snap_y, center_y, y)
+        can_turn = (snap_x | snap_y) & ~self.hits_wall(level, x + DX[nd] * speed, y + DY[nd] * speed)
+        d = np.where(can_turn, nd, d)
+
+        x = x + DX[d] * speed
+        y = y + DY[d] * speed
+
+        # Slide along the wall, first keeping X, then keeping Y, else stop
+        collided = self.hits_wall(level, x, y)
+        y = np.where(collided, old_y, y)
+        blocked_x = collided & self.hits_wall(level, x, y)
+        x = np.where(blocked_x, old_x, x)
+        y = np.where(blocked_x, old_y + DY[d] * speed, y)
+        blocked_y = blocked_x & self.hits_wall(level, x, y)
+        x = np.where(blocked_y, old_x, x)
+        y = np.where(blocked_y, old_y, y)
+
+        # After a bump, take next_direction if it is free
+        test_x = old_x + DX[nd] * speed
+        test_y = old_y + DY[nd] * speed
+        auto_turn = collided & (nd != d) & ~self.hits_wall(level, test_x, test_y)
+        d = np.where(auto_turn, nd, d)
+        x = np.where(auto_turn, test_x, x)
+        y = np.where(auto_turn, test_y, y)
+
+        x, y = self._wrap(x, y)
+        self.pacman_x = np.where(active, x, self.pacman_x)
+        self.pacman_y = np.where(active, y, self.pacman_y)
+        self.pacman_dir = np.where(active, d, self.pacman_dir)
+
+    def _update_ghosts(self, active):
+        shape = self.ghost_x.shape
+        frightened = self.ghost_frightened
+        active = active[:, None]
+        speed = np.where(frightened, FRIGHTENED_SPEED, self.ghost_speed[:, None])
+        level = self.level[:, None]
+        x, y, d = self.ghost_x, self.ghost_y, self.ghost_dir
+
+        counter = self.ghost_counter + 1
+        decide = counter >= GHOST_DECISION_TICKS
+        # Frightened ghosts never chase
+        chasing = np.where(decide, (self.rng.random(shape) < self.chase_probability[:, None]) & ~frightened,
+                           self.ghost_chasing)
+        d = np.where(decide & ~chasing, self.rng.integers(0, 4, shape), d)
+        counter = np.where(decide, 0, counter)
+
+        # Chasing ghosts take the shortest-path step whenever they pass a cell centre
+        col = x // self.cell_width
+        row = y // self.cell_height
+        center_x = col * self.cell_width + self.cell_width // 2
+        center_y = row * self.cell_height + self.cell_height // 2
+        aligned = chasing & (np.abs(x - center_x) < speed) & (np.abs(y - center_y) < speed)
+        ghost_cell = (row % self.rows) * self.cols + col % self.cols
+        pacman_cell = ((self.pacman_y // self.cell_height) % self.rows * self.cols
+                       + (self.pacman_x // self.cell_width) % self.cols)
+        move = self.next_moves[level, ghost_cell, pacman_cell[:, None]]
+        turn = aligned & (move >= 0) & (move != d)
+        x = np.where(turn, center_x, x)
+        y = np.where(turn, center_y, y)
+        d = np.where(turn, move, d)
+
+        new_x = x + DX[d] * speed
+        new_y = y + DY[d] * speed
+        collided = self.hits_wall(level, new_x, new_y)
+        new_x = np.where(collided, x, new_x)
+        new_y = np.where(collided, y, new_y)
+        d = np.where(collided, self.rng.integers(0, 4, shape), d)
+
+        new_x, new_y = self._wrap(new_x, new_y)
+        self.ghost_x = np.where(active, new_x, self.ghost_x)
+        self.ghost_y = np.where(active, new_y, self.ghost_y)
+        self.ghost_dir = np.where(active, d, self.ghost_dir)
+        self.ghost_counter = np.where(active, counter, self.ghost_counter)
+        self.ghost_chasing = np.where(active, chasing, self.ghost_chasing)
+
+    def _check_ghost_hits(self, active):
+        dx = np.abs(self.pacman_x[:, None] - self.ghost_x)
+        dy = np.abs(self.pacman_y[:, None] - self.ghost_y)
+        touching = active[:, None] & (dx < 2 * RADIUS) & (dy < 2 * RADIUS)
+        if not touching.any():
+            return
+
+        # Frightened ghosts are eaten, one after another in ghost order
+        eaten = touching & self.ghost_frightened
+        for index in np.flatnonzero(eaten.any(axis=0)):
+            games = eaten[:, index]
+            self.ghosts_eaten[games] += 1
+            self.score[games] += GHOST_POINTS * 2 ** (self.ghosts_eaten[games] - 1)
+
+            level = self.level[games]
+            self.ghost_x[games, index] = self.ghost_spawn[level, index, 0]
+            self.ghost_y[games, index] = self.ghost_spawn[level, index, 1]
+            self.ghost_dir[games, index] = self.rng.integers(0, 4, len(level))
+            self.ghost_counter[games, index] = 0
+            self.ghost_chasing[games, index] = False
+            self.ghost_frightened[games, index] = False
+
+        hit = (touching & ~eaten).any(axis=1)
+        if not hit.any():
+            return
+
+        self.lives[hit] -= 1
+        dead = hit & (self.lives <= 0)
+        self.state[dead] = GAME_OVER
+        # Like Game.update, losing a life only resets positions
+        respawn = hit & ~dead
+        if respawn.any():
+            self._respawn(respawn)
+
+    def _collect_dots(self, active):
+        games = np.arange(self.n_games)
+        pellet_eaten = np.zeros(self.n_games, dtype=bool)
+        x, y = self.pacman_x, self.pacman_y
+        left = x - RADIUS
+        top = y - RADIUS
+        cols = (left // self.cell_width, (left + 2 * RADIUS - 1) // self.cell_width)
+        rows = (top // self.cell_height, (top + 2 * RADIUS - 1) // self.cell_height)
+
+        for col in cols:
+            col_inside = (col >= 0) & (col < self.cols)
+            center_x = col * self.cell_width + self.cell_width // 2
+            col = np.clip(col, 0, self.cols - 1)
+            for row in rows:
+                inside = active & col_inside & (row >= 0) & (row < self.rows)
+                center_y = row * self.cell_height + self.cell_height // 2
+                row = np.clip(row, 0, self.rows - 1)
+                dist_x = np.abs(x - center_x)
+                dist_y = np.abs(y - center_y)
+
+                for items, radius, points in ((self.dots, DOT_RADIUS, SCORE_PER_DOT),
+                                              (self.pellets, PELLET_RADIUS, SCORE_PER_DOT * 5)):
+                    eaten = (inside & items[games, row, col]
+                             & (dist_x < RADIUS + radius) & (dist_y < RADIUS + radius))
+                    items[games[eaten], row[eaten], col[eaten]] = False
+                    self.score += eaten * points
+                    self.remaining -= eaten
+                    if items is self.pellets:
+                        pellet_eaten |= eaten
+
+        # Game.frighten_ghosts: slow down, stop chasing, turn back
+        if pellet_eaten.any():
+            self.ghost_frightened[pellet_eaten] = True
+            self.ghost_chasing[pellet_eaten] = False
+            self.ghost_dir[pellet_eaten] = REVERSE[self.ghost_dir[pellet_eaten]]
+            self.frightened_left[pellet_eaten] = FRIGHTENED_TICKS
+            self.ghosts_eaten[pellet_eaten] = 0
+
+    def _wrap(self, x, y):
+        x = np.where(x < 0, SCREEN_WIDTH, np.where(x > SCREEN_WIDTH, 0, x))
+        y = np.where(y < 0, SCREEN_HEIGHT, np.where(y > SCREEN_HEIGHT, 0, y))
+        return x, y
+
+    @property
+    def done(self):
+        return (self.state == GAME_OVER) | (self.state == WIN)
+
+
+def main():
+    # Quick throughput check: python batch_sim.py [games] [ticks]
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+
+    sim = BatchSim(n_games, pacman_speed=np.tile([2, 3, 4, 5], n_games // 4 + 1)[:n_games], seed=0)
+    rng = np.random.default_rng(1)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.step(rng.integers(NO_ACTION, 4, n_games))
+    elapsed = time.perf_counter() - start
+
+    print(f"{n_games * ticks / elapsed:.0f} game frames/s over {n_games} games")
+    print(f"mean score {sim.score.mean():.1f}, game over {np.count_nonzero(sim.state == GAME_OVER)}")
+
+
+if __name__ == "__main__":
+    main()
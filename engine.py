@@ -0,0 +1,15 @@
+# Explicit start-up for the games. Importing a game module has no side
+# effects; its main() calls bootstrap() to bring up SDL and open the window.
+# Game logic, replays and the headless tools never need it.
+import pygame
+
+
+def bootstrap(width, height, caption="Pac-Man"):
+    # Initialises every pygame module (audio included, when a device exists)
+    # and returns the window; calling it again reuses the open window
+    pygame.init()
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != (width, height):
+        screen = pygame.display.set_mode((width, height))
+        pygame.display.set_caption(caption)
+    return screen
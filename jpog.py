@@ -3,7 +3,11 @@ import pygame
 import random
 import sys
 
-pygame.init()
+from assets import frame_for_angle, load_image, preload, render_text, rotated_frames, silhouette
+from engine import bootstrap
+from maze_grid import DotGrid, SpatialHash, WallGrid, wall_rects
+from timer_wheel import TimerWheel
+from timestep import run_fixed
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -13,6 +17,16 @@ GHOST_SPEED = 2
 DOT_SIZE = 8
 SCORE_PER_DOT = 10
 
+# In logic ticks
+PACMAN_MOUTH_TICKS = 10
+GHOST_DECISION_TICKS = 60
+CHASE_PROBABILITY = 0.7
+PELLET_PULSE_TICKS = 30
+FRIGHTENED_TICKS = 60 * 6
+FRIGHTENED_SPEED = 1
+GHOST_POINTS = 200  # doubles for each further ghost on the same pellet
+LEVEL_COMPLETE_TICKS = 60 * 3
+
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 YELLOW = (255, 255, 0)
@@ -24,9 +38,19 @@ BLUE = (0, 0, 255)
 GREEN = (0, 255, 0)
 WALL_COLOR = (33, 33, 222)
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
+screen = None
+
+
+def init_engine():
+    global screen
+    screen = bootstrap(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+SPRITES = [
+    ('pacman.png', (30, 30)),
+    ('ghost.webp', (30, 30)),
+    ('dot.png', (DOT_SIZE, DOT_SIZE)),
+]
 
 MENU = 0
 PLAYING = 1
@@ -127,19 +151,23 @@ class PacMan:
         self.speed = PACMAN_SPEED
         self.mouth_open = True
         self.mouth_angle = 45
-        self.animation_counter = 0
         self.rotation = 0  # Rotation angle in degrees
 
-        self.image = pygame.image.load('pacman.png')
-        self.image = pygame.transform.scale(self.image, (30, 30))
-        self.original_image = self.image.copy()
+        self.frames = rotated_frames('pacman.png', (30, 30))
+
+    def respawn(self, x, y):
+        # Start of a new life, reusing this object and its frames
+        self.x = x
+        self.y = y
+        self.direction = "right"
+        self.next_direction = "right"
+        self.mouth_open = True
+        self.rotation = 0
 
-    def update(self, walls):
-        self.animation_counter += 1
-        if self.animation_counter >= 10:
-            self.mouth_open = not self.mouth_open
-            self.animation_counter = 0
+    def toggle_mouth(self):
+        self.mouth_open = not self.mouth_open
 
+    def update(self, wall_grid):
         # Store current position to revert if collision occurs
         old_x, old_y = self.x, self.y
 
@@ -160,17 +188,10 @@ class PacMan:
                 self.rotation = 270
 
             # Check for collision with walls
-            pacman_rect = self.get_rect()
-            collision = False
-            for wall in walls:
-                if pacman_rect.colliderect(wall.rect):
-                    collision = True
-                    break
-
-            if collision:
+            if wall_grid.collides(self.get_rect()):
                 # Revert position and direction
                 self.x, self.y = old_x, old_y
-                self.direction = self.next_direction = self.get_valid_direction(walls)
+                self.direction = self.next_direction = self.get_valid_direction(wall_grid)
 
         # Move in the current direction
         old_x, old_y = self.x, self.y
@@ -188,11 +209,8 @@ class PacMan:
             self.rotation = 270
 
         # Check for collision with walls
-        pacman_rect = self.get_rect()
-        for wall in walls:
-            if pacman_rect.colliderect(wall.rect):
-                self.x, self.y = old_x, old_y
-                break
+        if wall_grid.collides(self.get_rect()):
+            self.x, self.y = old_x, old_y
 
         # Wrap around screen edges
         if self.x < 0:
@@ -204,7 +222,7 @@ class PacMan:
         elif self.y > SCREEN_HEIGHT:
             self.y = 0
 
-    def get_valid_direction(self, walls):
+    def get_valid_direction(self, wall_grid):
         # Return a valid direction if current direction causes collision
         directions = ["right", "left", "up", "down"]
         for dir in directions:
@@ -219,20 +237,14 @@ class PacMan:
                 test_y += self.speed
 
             test_rect = pygame.Rect(test_x - self.radius, test_y - self.radius, self.radius * 2, self.radius * 2)
-            collision = False
-            for wall in walls:
-                if test_rect.colliderect(wall.rect):
-                    collision = True
-                    break
-
-            if not collision:
+            if not wall_grid.collides(test_rect):
                 return dir
 
         return self.direction  # If all directions cause collision, keep current
 
     def draw(self):
-        # Rotate the image based on direction
-        rotated_image = pygame.transform.rotate(self.original_image, self.rotation)
+        # Pick the cached frame for the current direction
+        rotated_image = frame_for_angle(self.frames, self.rotation)
         # Get the rect of the rotated image and set its center to the pacman's position
         rect = rotated_image.get_rect(center=(self.x, self.y))
         screen.blit(rotated_image, rect.topleft)
@@ -242,33 +254,47 @@ class PacMan:
 
 
 class Ghost:
-    def __init__(self, x, y, color):
+    def __init__(self, x, y, color, rng):
         self.x = x
         self.y = y
         self.color = color
         self.radius = 15
-        self.direction = random.choice(["right", "left", "up", "down"])
+        self.rng = rng
+        self.direction = self.rng.choice(["right", "left", "up", "down"])
         self.speed = GHOST_SPEED
-        self.change_direction_counter = 0
+        self.frightened = False
+
+        self.image = load_image('ghost.webp', (30, 30))
 
-        self.image = pygame.image.load('ghost.webp')
-        self.image = pygame.transform.scale(self.image, (30, 30))
+    def respawn(self, x, y):
+        self.x = x
+        self.y = y
+        self.direction = self.rng.choice(["right", "left", "up", "down"])
+        self.calm()
 
-    def update(self, pacman, walls):
-        self.change_direction_counter += 1
-        if self.change_direction_counter >= 60:
-            if random.random() < 0.7:
-                dx = pacman.x - self.x
-                dy = pacman.y - self.y
+    def decide(self, pacman):
+        # Head for Pac-Man or wander; frightened ghosts always wander
+        if not self.frightened and self.rng.random() < CHASE_PROBABILITY:
+            dx = pacman.x - self.x
+            dy = pacman.y - self.y
 
-                if abs(dx) > abs(dy):
-                    self.direction = "right" if dx > 0 else "left"
-                else:
-                    self.direction = "down" if dy > 0 else "up"
+            if abs(dx) > abs(dy):
+                self.direction = "right" if dx > 0 else "left"
             else:
-                self.direction = random.choice(["right", "left", "up", "down"])
+                self.direction = "down" if dy > 0 else "up"
+        else:
+            self.direction = self.rng.choice(["right", "left", "up", "down"])
+
+    def frighten(self):
+        self.frightened = True
+        self.speed = FRIGHTENED_SPEED
+        self.direction = {"right": "left", "left": "right", "up": "down", "down": "up"}[self.direction]
 
-            self.change_direction_counter = 0
+    def calm(self):
+        self.frightened = False
+        self.speed = GHOST_SPEED
+
+    def update(self, wall_grid):
 
         # Store current position to revert if collision occurs
         old_x, old_y = self.x, self.y
@@ -283,12 +309,9 @@ class Ghost:
             self.y += self.speed
 
         # Check for collision with walls
-        ghost_rect = self.get_rect()
-        for wall in walls:
-            if ghost_rect.colliderect(wall.rect):
-                self.x, self.y = old_x, old_y
-                self.direction = random.choice(["right", "left", "up", "down"])
-                break
+        if wall_grid.collides(self.get_rect()):
+            self.x, self.y = old_x, old_y
+            self.direction = self.rng.choice(["right", "left", "up", "down"])
 
         # Wrap around screen edges
         if self.x < 0:
@@ -301,7 +324,8 @@ class Ghost:
             self.y = 0
 
     def draw(self):
-        screen.blit(self.image, (self.x - 15, self.y - 15))
+        image = silhouette('ghost.webp', (30, 30), BLUE) if self.frightened else self.image
+        screen.blit(image, (self.x - 15, self.y - 15))
 
     def get_rect(self):
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
@@ -313,17 +337,11 @@ class PowerPellet:
         self.y = y
         self.radius = DOT_SIZE
         self.collected = False
-        self.animation_counter = 0
-
-    def update(self):
-        self.animation_counter += 1
-        if self.animation_counter >= 30:
-            self.animation_counter = 0
 
-    def draw(self):
+    def draw(self, phase):
         if not self.collected:
             # Pulsating effect
-            size_mod = abs(math.sin(self.animation_counter * 0.1)) * 2
+            size_mod = abs(math.sin(phase * 0.1)) * 2
             pygame.draw.circle(screen, WHITE, (self.x, self.y), self.radius + size_mod)
 
     def get_rect(self):
@@ -337,8 +355,7 @@ class Dot:
         self.radius = DOT_SIZE // 2
         self.collected = False
 
-        self.image = pygame.image.load('dot.png')
-        self.image = pygame.transform.scale(self.image, (DOT_SIZE, DOT_SIZE))
+        self.image = load_image('dot.png', (DOT_SIZE, DOT_SIZE))
 
     def draw(self):
         if not self.collected:
@@ -349,10 +366,11 @@ class Dot:
 
 
 class Game:
-    def __init__(self):
-        self.reset()
+    def __init__(self, seed=None):
+        self.reset(seed)
 
-    def reset(self):
+    def reset(self, seed=None):
+        self.rng = random.Random(seed)  # a seed makes the ghosts repeatable
         self.state = MENU
         self.level = 0
         self.pacman = None
@@ -360,6 +378,9 @@ class Game:
         self.dots = []
         self.power_pellets = []
         self.walls = []
+        self.wall_grid = None
+        self.dot_grid = None
+        self.ghost_hash = None
         self.score = 0
         self.lives = 3
         self.load_level(self.level)
@@ -377,6 +398,12 @@ class Game:
         layout = LEVEL_LAYOUTS[level_index]
         cell_width = SCREEN_WIDTH // len(layout[0])
         cell_height = SCREEN_HEIGHT // len(layout)
+        self.wall_grid = WallGrid(layout, cell_width, cell_height)
+        self.dot_grid = DotGrid(len(layout[0]), len(layout), cell_width, cell_height)
+
+        # Adjacent wall tiles merged into a few large rects, so there is far less to draw
+        for col, row, width, height in wall_rects(layout):
+            self.walls.append(Wall(col * cell_width, row * cell_height, width * cell_width, height * cell_height))
 
         pacman_pos = None
         ghost_positions = []
@@ -386,36 +413,95 @@ class Game:
                 cell_x = x * cell_width + cell_width // 2
                 cell_y = y * cell_height + cell_height // 2
 
-                if cell == 1:  # Wall
-                    self.walls.append(Wall(x * cell_width, y * cell_height, cell_width, cell_height))
-                elif cell == 2:  # Dot
+                if cell == 2:  # Dot
                     self.dots.append(Dot(cell_x, cell_y))
+                    self.dot_grid.add(self.dots[-1])
                 elif cell == 3:  # Power Pellet
                     self.power_pellets.append(PowerPellet(cell_x, cell_y))
+                    self.dot_grid.add(self.power_pellets[-1])
                 elif cell == 4:  # Pacman start
                     pacman_pos = (cell_x, cell_y)
                 elif cell >= 5 and cell <= 8:  # Ghost starts
                     ghost_positions.append((cell_x, cell_y, cell - 5))
 
         # Create Pacman
-        if pacman_pos:
-            self.pacman = PacMan(pacman_pos[0], pacman_pos[1])
-        else:
-            self.pacman = PacMan(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.pacman_spawn = pacman_pos or (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.pacman = PacMan(*self.pacman_spawn)
 
         # Create Ghosts
         ghost_colors = [RED, PINK, CYAN, ORANGE]
         for pos in ghost_positions:
-            self.ghosts.append(Ghost(pos[0], pos[1], ghost_colors[pos[2]]))
+            self.ghosts.append(Ghost(pos[0], pos[1], ghost_colors[pos[2]], self.rng))
 
         # If no ghosts defined in the layout, create default ones
         if not self.ghosts:
             self.ghosts = [
-                Ghost(100, 100, RED),
-                Ghost(SCREEN_WIDTH - 100, 100, PINK),
-                Ghost(100, SCREEN_HEIGHT - 100, CYAN),
-                Ghost(SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100, ORANGE)
+                Ghost(100, 100, RED, self.rng),
+                Ghost(SCREEN_WIDTH - 100, 100, PINK, self.rng),
+                Ghost(100, SCREEN_HEIGHT - 100, CYAN, self.rng),
+                Ghost(SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100, ORANGE, self.rng)
             ]
+        self.ghost_spawns = [(ghost.x, ghost.y) for ghost in self.ghosts]
+
+        # Ghosts bucketed by maze cell, so collision checks only look nearby
+        self.ghost_hash = SpatialHash(self.wall_grid.cols, self.wall_grid.rows, self.wall_grid.cell_width,
+                                      self.wall_grid.cell_height, max(e.radius for e in self.ghosts + [self.pacman]))
+        for ghost in self.ghosts:
+            self.ghost_hash.insert(ghost)
+
+        self.timers = TimerWheel()
+        self.ghosts_eaten = 0
+        self.start_timers()
+
+    def respawn(self):
+        # After a lost life: the same Pac-Man and ghosts go back to their spawn
+        # cells with fresh per-life state; eaten dots and pellets stay eaten
+        self.pacman.respawn(*self.pacman_spawn)
+        for ghost, (x, y) in zip(self.ghosts, self.ghost_spawns):
+            ghost.respawn(x, y)
+            self.ghost_hash.move(ghost)
+        self.timers.cancel("frightened_end")
+        self.start_timers()
+
+    def start_timers(self):
+        self.timers.set("pacman_mouth", PACMAN_MOUTH_TICKS)
+        for index in range(len(self.ghosts)):
+            self.timers.set(("ghost", index), GHOST_DECISION_TICKS)
+
+    def run_timers(self):
+        for key in self.timers.advance():
+            if key == "pacman_mouth":
+                self.pacman.toggle_mouth()
+                self.timers.set(key, PACMAN_MOUTH_TICKS)
+            elif key == "frightened_end":
+                for ghost in self.ghosts:
+                    ghost.calm()
+            elif key == "next_level":
+                self.next_level()
+            else:
+                _, index = key  # ("ghost", index)
+                self.ghosts[index].decide(self.pacman)
+                self.timers.set(key, GHOST_DECISION_TICKS)
+
+    def frighten_ghosts(self):
+        self.ghosts_eaten = 0
+        for ghost in self.ghosts:
+            ghost.frighten()
+        self.timers.set("frightened_end", FRIGHTENED_TICKS)
+
+    def eat_ghost(self, index):
+        self.ghosts_eaten += 1
+        self.score += GHOST_POINTS * 2 ** (self.ghosts_eaten - 1)
+
+        ghost = self.ghosts[index]
+        ghost.respawn(*self.ghost_spawns[index])
+        self.ghost_hash.move(ghost)
+        self.timers.set(("ghost", index), GHOST_DECISION_TICKS)
+
+    def next_level(self):
+        self.level += 1
+        self.load_level(self.level)
+        self.state = PLAYING
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -432,9 +518,7 @@ class Game:
                         self.reset()
                 elif self.state == LEVEL_COMPLETE:
                     if event.key == pygame.K_SPACE:
-                        self.level += 1
-                        self.load_level(self.level)
-                        self.state = PLAYING
+                        self.next_level()
                 elif self.state == PLAYING:
                     if event.key == pygame.K_RIGHT:
                         self.pacman.next_direction = "right"
@@ -446,36 +530,47 @@ class Game:
                         self.pacman.next_direction = "down"
 
     def update(self):
-        if self.state == PLAYING:
-            self.pacman.update(self.walls)
-
-            for ghost in self.ghosts:
-                ghost.update(self.pacman, self.walls)
+        if self.state == LEVEL_COMPLETE:
+            self.run_timers()  # counts down to the next level
 
-                if self.pacman.get_rect().colliderect(ghost.get_rect()):
-                    self.lives -= 1
-                    if self.lives <= 0:
-                        self.state = GAME_OVER
-                    else:
-                        # Reset positions but keep the level
-                        self.load_level(self.level)
-                        break
+        elif self.state == PLAYING:
+            self.run_timers()
+            self.pacman.update(self.wall_grid)
 
-            for dot in self.dots:
-                if not dot.collected and self.pacman.get_rect().colliderect(dot.get_rect()):
-                    dot.collected = True
-                    self.score += SCORE_PER_DOT
+            for ghost in self.ghosts:
+                ghost.update(self.wall_grid)
+                self.ghost_hash.move(ghost)
+
+            # Only ghosts in the buckets around Pac-Man can be touching him
+            touching = set(self.ghost_hash.overlapping(self.pacman))
+            caught = False
+            if touching:
+                for index, ghost in enumerate(self.ghosts):
+                    if ghost in touching:
+                        if ghost.frightened:
+                            self.eat_ghost(index)
+                        else:
+                            caught = True
+            if caught:
+                self.lives -= 1
+                if self.lives <= 0:
+                    self.state = GAME_OVER
+                else:
+                    self.respawn()
 
-            for pellet in self.power_pellets:
-                if not pellet.collected and self.pacman.get_rect().colliderect(pellet.get_rect()):
-                    pellet.collected = True
+            for item in self.dot_grid.collect(self.pacman.get_rect()):
+                if isinstance(item, PowerPellet):
                     self.score += SCORE_PER_DOT * 5
-                    # TODO: Make ghosts vulnerable
+                    self.frighten_ghosts()
+                else:
+                    self.score += SCORE_PER_DOT
 
             # Check if all dots and power pellets are collected
-            if all(dot.collected for dot in self.dots) and all(pellet.collected for pellet in self.power_pellets):
+            if self.dot_grid.remaining == 0:
                 if self.level < len(LEVEL_LAYOUTS) - 1:
                     self.state = LEVEL_COMPLETE
+                    self.timers.clear()
+                    self.timers.set("next_level", LEVEL_COMPLETE_TICKS)
                 else:
                     self.state = WIN
 
@@ -483,12 +578,10 @@ class Game:
         screen.fill(BLACK)
 
         if self.state == MENU:
-            font = pygame.font.SysFont(None, 72)
-            title = font.render("PAC-MAN", True, YELLOW)
+            title = render_text("PAC-MAN", YELLOW, 72)
             screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, SCREEN_HEIGHT // 3))
 
-            font = pygame.font.SysFont(None, 36)
-            instruction = font.render("Press SPACE to start", True, WHITE)
+            instruction = render_text("Press SPACE to start", WHITE, 36)
             screen.blit(instruction, (SCREEN_WIDTH // 2 - instruction.get_width() // 2, SCREEN_HEIGHT // 2))
 
         elif self.state == PLAYING or self.state == GAME_OVER or self.state == LEVEL_COMPLETE or self.state == WIN:
@@ -501,23 +594,22 @@ class Game:
                 dot.draw()
 
             # Draw power pellets
+            phase = self.timers.now % PELLET_PULSE_TICKS
             for pellet in self.power_pellets:
-                pellet.update()
-                pellet.draw()
+                pellet.draw(phase)
 
             self.pacman.draw()
 
             for ghost in self.ghosts:
                 ghost.draw()
 
-            font = pygame.font.SysFont(None, 36)
-            score_text = font.render(f"Score: {self.score}", True, WHITE)
+            score_text = render_text(f"Score: {self.score}", WHITE, 36)
             screen.blit(score_text, (10, 10))
 
-            lives_text = font.render(f"Lives: {self.lives}", True, WHITE)
+            lives_text = render_text(f"Lives: {self.lives}", WHITE, 36)
             screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 10, 10))
 
-            level_text = font.render(f"Level: {self.level + 1}", True, WHITE)
+            level_text = render_text(f"Level: {self.level + 1}", WHITE, 36)
             screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, 10))
 
             if self.state == GAME_OVER:
@@ -525,16 +617,13 @@ class Game:
                 overlay.fill((0, 0, 0, 128))
                 screen.blit(overlay, (0, 0))
 
-                font = pygame.font.SysFont(None, 72)
-                game_over = font.render("GAME OVER", True, RED)
+                game_over = render_text("GAME OVER", RED, 72)
                 screen.blit(game_over, (SCREEN_WIDTH // 2 - game_over.get_width() // 2, SCREEN_HEIGHT // 3))
 
-                font = pygame.font.SysFont(None, 48)
-                final_score = font.render(f"Final Score: {self.score}", True, WHITE)
+                final_score = render_text(f"Final Score: {self.score}", WHITE, 48)
                 screen.blit(final_score, (SCREEN_WIDTH // 2 - final_score.get_width() // 2, SCREEN_HEIGHT // 2))
 
-                font = pygame.font.SysFont(None, 36)
-                restart = font.render("Press SPACE to restart", True, WHITE)
+                restart = render_text("Press SPACE to restart", WHITE, 36)
                 screen.blit(restart, (SCREEN_WIDTH // 2 - restart.get_width() // 2, SCREEN_HEIGHT // 2 + 60))
 
             elif self.state == WIN:
@@ -542,16 +631,13 @@ class Game:
                 overlay.fill((0, 0, 0, 128))
                 screen.blit(overlay, (0, 0))
 
-                font = pygame.font.SysFont(None, 72)
-                win_text = font.render("YOU WIN!", True, GREEN)
+                win_text = render_text("YOU WIN!", GREEN, 72)
                 screen.blit(win_text, (SCREEN_WIDTH // 2 - win_text.get_width() // 2, SCREEN_HEIGHT // 3))
 
-                font = pygame.font.SysFont(None, 48)
-                final_score = font.render(f"Final Score: {self.score}", True, WHITE)
+                final_score = render_text(f"Final Score: {self.score}", WHITE, 48)
                 screen.blit(final_score, (SCREEN_WIDTH // 2 - final_score.get_width() // 2, SCREEN_HEIGHT // 2))
 
-                font = pygame.font.SysFont(None, 36)
-                restart = font.render("Press SPACE to restart", True, WHITE)
+                restart = render_text("Press SPACE to restart", WHITE, 36)
                 screen.blit(restart, (SCREEN_WIDTH // 2 - restart.get_width() // 2, SCREEN_HEIGHT // 2 + 60))
 
             elif self.state == LEVEL_COMPLETE:
@@ -559,16 +645,13 @@ class Game:
                 overlay.fill((0, 0, 0, 128))
                 screen.blit(overlay, (0, 0))
 
-                font = pygame.font.SysFont(None, 72)
-                level_complete = font.render(f"LEVEL {self.level + 1} COMPLETE!", True, GREEN)
+                level_complete = render_text(f"LEVEL {self.level + 1} COMPLETE!", GREEN, 72)
                 screen.blit(level_complete, (SCREEN_WIDTH // 2 - level_complete.get_width() // 2, SCREEN_HEIGHT // 3))
 
-                font = pygame.font.SysFont(None, 48)
-                current_score = font.render(f"Score: {self.score}", True, WHITE)
+                current_score = render_text(f"Score: {self.score}", WHITE, 48)
                 screen.blit(current_score, (SCREEN_WIDTH // 2 - current_score.get_width() // 2, SCREEN_HEIGHT // 2))
 
-                font = pygame.font.SysFont(None, 36)
-                next_level = font.render("Press SPACE for next level", True, WHITE)
+                next_level = render_text("Press SPACE for next level", WHITE, 36)
                 screen.blit(next_level, (SCREEN_WIDTH // 2 - next_level.get_width() // 2, SCREEN_HEIGHT // 2 + 60))
 
         pygame.display.flip()
@@ -578,14 +661,12 @@ def main():
     # Add missing import
 
 
+    init_engine()
+    clock = pygame.time.Clock()
+    preload(SPRITES)
     game = Game()
 
-    running = True
-    while running:
-        game.handle_events()
-        game.update()
-        game.draw()
-        clock.tick(60)
+    run_fixed(game, clock)
 
 
 if __name__ == "__main__":
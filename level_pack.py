@@ -0,0 +1,185 @@
+# Compiled level packs: everything Game.load_level needs for one maze, laid
+# out flat so a level is loaded by memory-mapping a file instead of walking
+# the nested LEVEL_LAYOUTS lists.
+#
+#     python level_pack.py [directory]    writes level_00.pmlv, level_01.pmlv, ...
+#
+# File layout (little endian):
+#   header (see HEADER below)
+#   grid       rows * cols u8, the layout cells as written in LEVEL_LAYOUTS
+#   walls      n_walls * (x, y, width, height) u16, merged by maze_grid.wall_rects
+#   ghosts     n_ghosts * (x, y, colour index) u16
+#   dots       n_dots * (x, y) u16
+#   pellets    n_pellets * (x, y) u16
+#   nav        cells * cells u8 if has_nav: for target cell t and cell c,
+#              nav[t * cells + c] indexes DIRECTIONS for the first step
+#              from c towards t, NO_MOVE if there is none
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from maze_grid import DIRECTIONS, NavGrid, WallGrid, wall_rects
+
+MAGIC = b"PMLV"
+VERSION = 1
+# magic, version, cols, rows, cell width, cell height, layout checksum,
+# pacman x, pacman y (-1 if the layout has none), n_walls, n_ghosts, n_dots,
+# n_pellets, has_nav
+HEADER = struct.Struct("<4sBHHHHIhhHHHHB")
+RECT = struct.Struct("<HHHH")
+SPAWN = struct.Struct("<HHH")
+POINT = struct.Struct("<HH")
+NO_MOVE = 255
+
+DOT = 2
+POWER_PELLET = 3
+PACMAN_START = 4
+GHOST_STARTS = range(5, 9)
+
+
+def layout_checksum(layout):
+    return zlib.crc32(bytes(cell for row in layout for cell in row))
+
+
+def pack_path(directory, index):
+    return os.path.join(directory, f"level_{index:02d}.pmlv")
+
+
+def compile_level(layout, cell_width, cell_height, nav=True):
+    rows = len(layout)
+    cols = len(layout[0])
+
+    pacman = (-1, -1)
+    ghosts = []
+    dots = []
+    pellets = []
+    for y, row in enumerate(layout):
+        for x, cell in enumerate(row):
+            center = (x * cell_width + cell_width // 2, y * cell_height + cell_height // 2)
+            if cell == DOT:
+                dots.append(center)
+            elif cell == POWER_PELLET:
+                pellets.append(center)
+            elif cell == PACMAN_START:
+                pacman = center
+            elif cell in GHOST_STARTS:
+                ghosts.append(center + (cell - GHOST_STARTS.start,))
+
+    walls = [(col * cell_width, row * cell_height, width * cell_width, height * cell_height)
+             for col, row, width, height in wall_rects(layout)]
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, cols, rows, cell_width, cell_height,
+                                layout_checksum(layout), pacman[0], pacman[1],
+                                len(walls), len(ghosts), len(dots), len(pellets), nav))
+    out += bytes(cell for row in layout for cell in row)
+    for rect in walls:
+        out += RECT.pack(*rect)
+    for spawn in ghosts:
+        out += SPAWN.pack(*spawn)
+    for point in dots + pellets:
+        out += POINT.pack(*point)
+
+    if nav:
+        nav_grid = NavGrid(layout)
+        cells = rows * cols
+        no_moves = bytes([NO_MOVE]) * cells
+        for target in range(cells):
+            target_col, target_row = target % cols, target // cols
+            if not nav_grid.open[target_row][target_col]:
+                out += no_moves
+                continue
+            moves = nav_grid.next_moves(target_col, target_row)
+            out += bytes(NO_MOVE if move is None else DIRECTIONS.index(move) for move in moves)
+    return bytes(out)
+
+
+class LevelPack:
+    # A compiled level, parsed from bytes or a memory-mapped file. The small
+    # sections are unpacked up front; the nav table stays in the buffer and is
+    # read one byte per lookup. next_move matches NavGrid.next_move, so a pack
+    # can stand in for a NavGrid.
+    def __init__(self, data):
+        (magic, version, self.cols, self.rows, self.cell_width, self.cell_height, self.checksum,
+         pacman_x, pacman_y, n_walls, n_ghosts, n_dots, n_pellets, has_nav) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Pac-Man level pack")
+        if version != VERSION:
+            raise ValueError(f"unsupported level pack version {version}")
+
+        cells = self.rows * self.cols
+        size = (HEADER.size + cells + n_walls * RECT.size + n_ghosts * SPAWN.size
+                + (n_dots + n_pellets) * POINT.size + (cells * cells if has_nav else 0))
+        if len(data) < size:
+            raise ValueError(f"truncated level pack: {len(data)} bytes, expected {size}")
+
+        self.pacman_spawn = (pacman_x, pacman_y) if pacman_x >= 0 else None
+
+        view = memoryview(data)
+        pos = HEADER.size
+        self.grid = view[pos:pos + cells]
+        pos += cells
+        self.wall_rects = list(RECT.iter_unpack(view[pos:pos + n_walls * RECT.size]))
+        pos += n_walls * RECT.size
+        self.ghost_spawns = list(SPAWN.iter_unpack(view[pos:pos + n_ghosts * SPAWN.size]))
+        pos += n_ghosts * SPAWN.size
+        self.dots = list(POINT.iter_unpack(view[pos:pos + n_dots * POINT.size]))
+        pos += n_dots * POINT.size
+        self.pellets = list(POINT.iter_unpack(view[pos:pos + n_pellets * POINT.size]))
+        pos += n_pellets * POINT.size
+
+        self.nav = view[pos:pos + cells * cells] if has_nav else None
+        self._nav_grid = None
+        self._wall_grid = None
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def layout(self):
+        return [list(self.grid[row * self.cols:(row + 1) * self.cols]) for row in range(self.rows)]
+
+    @property
+    def wall_grid(self):
+        # Levels never change, so one WallGrid serves every load of this pack
+        if self._wall_grid is None:
+            self._wall_grid = WallGrid(self.layout(), self.cell_width, self.cell_height)
+        return self._wall_grid
+
+    def cell_index(self, col, row):
+        return (row % self.rows) * self.cols + (col % self.cols)
+
+    def next_move(self, col, row, target_col, target_row):
+        if self.nav is None:
+            # Packed without tables: fall back to BFS on demand
+            if self._nav_grid is None:
+                self._nav_grid = NavGrid(self.layout())
+            return self._nav_grid.next_move(col, row, target_col, target_row)
+
+        move = self.nav[self.cell_index(target_col, target_row) * self.rows * self.cols + self.cell_index(col, row)]
+        return None if move == NO_MOVE else DIRECTIONS[move]
+
+
+def compile_levels(layouts, screen_width, screen_height, directory):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index, layout in enumerate(layouts):
+        path = pack_path(directory, index)
+        with open(path, "wb") as f:
+            f.write(compile_level(layout, screen_width // len(layout[0]), screen_height // len(layout)))
+        paths.append(path)
+    return paths
+
+
+def main():
+    from RAIDACODEZDES import LEVEL_LAYOUTS, LEVEL_PACK_DIR, SCREEN_HEIGHT, SCREEN_WIDTH
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else LEVEL_PACK_DIR
+    for path in compile_levels(LEVEL_LAYOUTS, SCREEN_WIDTH, SCREEN_HEIGHT, directory):
+        print(f"{path}: {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
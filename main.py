@@ -1,10 +1,13 @@
+import gc
+import os
 import pygame
 import random
 import sys
 import math
 
-# Initialize Pygame
-pygame.init()
+from engine import bootstrap
+from maze_grid import RectIndex
+from timestep import run_fixed
 
 # Game constants
 SCREEN_WIDTH = 800
@@ -17,13 +20,18 @@ DOT_COLOR = (255, 255, 0)  # Yellow
 SCORE_COLOR = (255, 255, 255)  # White
 BG_COLOR = (0, 0, 0)  # Black
 
-# Create the screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
+# Screen, clock and font are created by init_engine(), not on import
+screen = None
+clock = None
+font = None
+
+
+def init_engine():
+    global screen, clock, font
+    screen = bootstrap(SCREEN_WIDTH, SCREEN_HEIGHT)
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont('Arial', 24)
 
-# Load fonts
-font = pygame.font.SysFont('Arial', 24)
 
 class Player:
     def __init__(self, x, y):
@@ -34,12 +42,20 @@ class Player:
         self.speed = PLAYER_SPEED
         self.mouth_open = True
         self.mouth_counter = 0
+        self.spawn = (x, y)
         
         # COMMENT: Replace this with your Pac-Man image
         # self.image = pygame.image.load('pacman.png')
         # self.image = pygame.transform.scale(self.image, (30, 30))
+
+    def reset(self):
+        # Back to the spawn point for a new game, reusing this object
+        self.x, self.y = self.spawn
+        self.direction = 0
+        self.mouth_open = True
+        self.mouth_counter = 0
         
-    def update(self, walls):
+    def update(self, wall_index):
         # Movement based on direction
         dx, dy = 0, 0
         if self.direction == 0:  # Right
@@ -55,13 +71,9 @@ class Player:
         new_x = self.x + dx
         new_y = self.y + dy
         
-        # Simple collision detection with walls
-        can_move = True
-        for wall in walls:
-            if wall.colliderect(pygame.Rect(new_x - self.radius, new_y - self.radius, 
-                                           self.radius * 2, self.radius * 2)):
-                can_move = False
-                break
+        # Only the walls in the index buckets around the new position are tested
+        can_move = not wall_index.collides_at(new_x - self.radius, new_y - self.radius,
+                                         self.radius * 2, self.radius * 2)
         
         if can_move:
             self.x = new_x
@@ -127,12 +139,18 @@ class Ghost:
         self.speed = GHOST_SPEED
         self.direction = random.randint(0, 3)
         self.change_direction_counter = 0
+        self.spawn = (x, y)
         
         # COMMENT: Replace this with your Ghost image
         # self.image = pygame.image.load(f'ghost_{color}.png')
         # self.image = pygame.transform.scale(self.image, (30, 30))
+
+    def reset(self):
+        self.x, self.y = self.spawn
+        self.direction = random.randint(0, 3)
+        self.change_direction_counter = 0
     
-    def update(self, player, walls):
+    def update(self, player, wall_index):
         # Occasionally change direction randomly or chase player
         self.change_direction_counter += 1
         if self.change_direction_counter >= 60:  # Change direction every ~2 seconds
@@ -168,15 +186,12 @@ class Ghost:
         new_x = self.x + dx
         new_y = self.y + dy
         
-        # Simple collision detection with walls
-        can_move = True
-        for wall in walls:
-            if wall.colliderect(pygame.Rect(new_x - self.radius, new_y - self.radius, 
-                                           self.radius * 2, self.radius * 2)):
-                can_move = False
-                # Choose a new random direction if blocked
-                self.direction = random.randint(0, 3)
-                break
+        # Only the walls in the index buckets around the new position are tested
+        can_move = not wall_index.collides_at(new_x - self.radius, new_y - self.radius,
+                                         self.radius * 2, self.radius * 2)
+        if not can_move:
+            # Choose a new random direction if blocked
+            self.direction = random.randint(0, 3)
         
         if can_move:
             self.x = new_x
@@ -260,124 +275,196 @@ def create_walls():
     
     return walls
 
-def create_dots(walls):
+def create_dots(wall_index):
     dots = []
     dot_spacing = 40
+
+    # Set wherever a dot's rect would overlap a wall
+    blocked = wall_index.occupancy_mask(DOT_SIZE // 2)
     
     for x in range(dot_spacing, SCREEN_WIDTH, dot_spacing):
         for y in range(dot_spacing, SCREEN_HEIGHT, dot_spacing):
-            # Check if dot would be inside a wall
-            dot_rect = pygame.Rect(x - DOT_SIZE//2, y - DOT_SIZE//2, DOT_SIZE, DOT_SIZE)
-            collision = False
-            for wall in walls:
-                if wall.colliderect(dot_rect):
-                    collision = True
-                    break
-            
-            if not collision:
+            if not blocked.is_blocked(x, y):
                 dots.append(Dot(x, y))
     
     return dots
 
-def main():
-    # Create game objects
-    walls = create_walls()
-    dots = create_dots(walls)
-    player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-    
-    # Create ghosts with different colors
-    ghosts = [
-        Ghost(100, 100, (255, 0, 0)),    # Red ghost
-        Ghost(700, 100, (255, 192, 203)), # Pink ghost
-        Ghost(100, 500, (0, 255, 255)),  # Cyan ghost
-        Ghost(700, 500, (255, 165, 0))   # Orange ghost
-    ]
-    
-    score = 0
-    game_over = False
-    
-    # Main game loop
-    while True:
+class Session:
+    # One game on the static maze. Walls and their index, dots, the player and
+    # the ghosts are created once and reset in place, so restarting allocates
+    # nothing and a kiosk can run for days.
+    def __init__(self):
+        self.walls = create_walls()
+        # Built once: the walls never move, movement and dot placement query this
+        self.wall_index = RectIndex(self.walls, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.dots = create_dots(self.wall_index)
+        self.remaining = len(self.dots)  # dots not yet collected
+        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+
+        # Create ghosts with different colors
+        self.ghosts = [
+            Ghost(100, 100, (255, 0, 0)),    # Red ghost
+            Ghost(700, 100, (255, 192, 203)), # Pink ghost
+            Ghost(100, 500, (0, 255, 255)),  # Cyan ghost
+            Ghost(700, 500, (255, 165, 0))   # Orange ghost
+        ]
+
+        self.score = 0
+        self.game_over = False
+        self.won = False
+
+    def reset(self):
+        for dot in self.dots:
+            dot.collected = False
+        self.remaining = len(self.dots)
+        self.player.reset()
+        for ghost in self.ghosts:
+            ghost.reset()
+
+        self.score = 0
+        self.game_over = False
+        self.won = False
+
+    def handle_events(self):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            
-            # Handle key presses
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RIGHT:
-                    player.direction = 0
-                elif event.key == pygame.K_DOWN:
-                    player.direction = 1
-                elif event.key == pygame.K_LEFT:
-                    player.direction = 2
-                elif event.key == pygame.K_UP:
-                    player.direction = 3
-                elif event.key == pygame.K_r and game_over:
-                    # Restart game
-                    return main()
-        
-        if not game_over:
-            # Update game objects
-            player.update(walls)
-            
-            # Check for dot collisions
-            for dot in dots:
-                if dot.check_collision(player):
-                    score += 10
-            
-            # Update ghosts
-            for ghost in ghosts:
-                ghost.update(player, walls)
-                
-                # Check for ghost collision
-                distance = math.sqrt((player.x - ghost.x) ** 2 + (player.y - ghost.y) ** 2)
-                if distance < player.radius + ghost.radius:
-                    game_over = True
-            
-            # Check win condition
-            all_dots_collected = True
-            for dot in dots:
-                if not dot.collected:
-                    all_dots_collected = False
-                    break
-            
-            if all_dots_collected:
-                game_over = True
-        
-        # Draw everything
+            self.handle_event(event)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+
+        # Handle key presses
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RIGHT:
+                self.player.direction = 0
+            elif event.key == pygame.K_DOWN:
+                self.player.direction = 1
+            elif event.key == pygame.K_LEFT:
+                self.player.direction = 2
+            elif event.key == pygame.K_UP:
+                self.player.direction = 3
+            elif event.key == pygame.K_r and self.game_over:
+                # Restart game
+                self.reset()
+
+    def update(self):
+        if self.game_over:
+            return
+
+        # Update game objects
+        player = self.player
+        player.update(self.wall_index)
+
+        # Check for dot collisions
+        for dot in self.dots:
+            if dot.check_collision(player):
+                self.score += 10
+                self.remaining -= 1
+
+        # Update ghosts
+        for ghost in self.ghosts:
+            ghost.update(player, self.wall_index)
+
+            # Check for ghost collision
+            distance = math.sqrt((player.x - ghost.x) ** 2 + (player.y - ghost.y) ** 2)
+            if distance < player.radius + ghost.radius:
+                self.game_over = True
+
+        # Check win condition
+        if self.remaining == 0:
+            self.game_over = True
+            self.won = True
+
+    def draw(self):
         screen.fill(BG_COLOR)
-        
+
         # Draw walls
-        for wall in walls:
+        for wall in self.walls:
             pygame.draw.rect(screen, WALL_COLOR, wall)
-        
+
         # Draw dots
-        for dot in dots:
+        for dot in self.dots:
             dot.draw()
-        
+
         # Draw player and ghosts
-        player.draw()
-        for ghost in ghosts:
+        self.player.draw()
+        for ghost in self.ghosts:
             ghost.draw()
-        
+
         # Draw score
-        score_text = font.render(f'Score: {score}', True, SCORE_COLOR)
+        score_text = font.render(f'Score: {self.score}', True, SCORE_COLOR)
         screen.blit(score_text, (10, 10))
-        
+
         # Draw game over message
-        if game_over:
-            if all_dots_collected:
+        if self.game_over:
+            if self.won:
                 message = "You Win! Press R to restart"
             else:
                 message = "Game Over! Press R to restart"
-            
+
             game_over_text = font.render(message, True, SCORE_COLOR)
             text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             screen.blit(game_over_text, text_rect)
-        
+
         pygame.display.flip()
-        clock.tick(60)
+
+
+def main():
+    init_engine()
+    session = Session()
+
+    # R resets the same session instead of starting a new one
+    run_fixed(session, clock)
+
+
+def resident_kib():
+    # Current resident set size, or None where /proc isn't available
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def soak(restarts, max_ticks=60, draw_every=10, report_every=500):
+    # Plays `restarts` short automated games back to back on one session, as
+    # fast as possible, and prints memory use as it goes. After the first
+    # report the RSS and object counts should stay flat; steady growth is a leak.
+    #     python main.py --soak [restarts]
+    init_engine()
+    random.seed(0)
+    session = Session()
+    reports = []
+    for restart in range(1, restarts + 1):
+        for tick in range(max_ticks):
+            if tick % 30 == 0:
+                session.player.direction = random.randint(0, 3)
+            session.update()
+            if tick % draw_every == 0:
+                session.draw()
+            if session.game_over:
+                break
+        pygame.event.pump()
+        session.reset()
+
+        if restart % report_every == 0 or restart == restarts:
+            gc.collect()
+            rss = resident_kib()
+            objects = len(gc.get_objects())
+            reports.append((rss, objects))
+            print(f"restart {restart:6d}  rss {rss if rss is not None else 'n/a':>8} KiB  objects {objects}")
+
+    rss, objects = reports[0]
+    final_rss, final_objects = reports[-1]
+    if rss is not None:
+        print(f"rss growth since first report: {final_rss - rss} KiB")
+    print(f"object growth since first report: {final_objects - objects}")
+
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "--soak":
+        soak(int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
+    else:
+        main()
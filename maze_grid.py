@@ -0,0 +1,341 @@
+# Grid helpers for the tile mazes in LEVEL_LAYOUTS, and RectIndex for walls
+# that don't sit on tiles.
+# Everything here works on plain ints, so it can be used with or without a display.
+import math
+
+WALL = 1
+
+
+class CellGrid:
+    def __init__(self, cols, rows, cell_width, cell_height):
+        self.cols = cols
+        self.rows = rows
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+
+    def cell_range(self, left, top, width, height):
+        # Columns and rows touched by the rect, clipped to the maze
+        first_col = max(left // self.cell_width, 0)
+        last_col = min((left + width - 1) // self.cell_width, self.cols - 1)
+        first_row = max(top // self.cell_height, 0)
+        last_row = min((top + height - 1) // self.cell_height, self.rows - 1)
+        return range(first_col, last_col + 1), range(first_row, last_row + 1)
+
+
+def wall_rects(layout):
+    # Covers the wall cells with few, large rectangles instead of one per tile:
+    # from each uncovered wall cell take the longest run to the right, then
+    # grow it downwards while the whole run below is uncovered wall.
+    # Yields (col, row, width, height) in cells.
+    rows = len(layout)
+    cols = len(layout[0])
+    covered = [[False] * cols for _ in range(rows)]
+
+    def free(col, row):
+        return layout[row][col] == WALL and not covered[row][col]
+
+    for row in range(rows):
+        for col in range(cols):
+            if not free(col, row):
+                continue
+
+            width = 1
+            while col + width < cols and free(col + width, row):
+                width += 1
+            height = 1
+            while row + height < rows and all(free(c, row + height) for c in range(col, col + width)):
+                height += 1
+
+            for r in range(row, row + height):
+                covered[r][col:col + width] = [True] * width
+            yield col, row, width, height
+
+
+class WallGrid(CellGrid):
+    def __init__(self, layout, cell_width, cell_height):
+        super().__init__(len(layout[0]), len(layout), cell_width, cell_height)
+        self.cells = [[cell == WALL for cell in row] for row in layout]
+
+    def collides_at(self, left, top, width, height):
+        # Same answer as colliderect against every wall tile, but only looks
+        # at the (at most four) cells the rect overlaps
+        if width <= 0 or height <= 0:
+            return False
+
+        cols, rows = self.cell_range(int(left), int(top), int(width), int(height))
+        for row in rows:
+            line = self.cells[row]
+            for col in cols:
+                if line[col]:
+                    return True
+        return False
+
+    def collides(self, rect):
+        return self.collides_at(rect.x, rect.y, rect.width, rect.height)
+
+    def is_wall(self, col, row):
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.cells[row][col]
+        return False
+
+
+class RectIndex(CellGrid):
+    # Static index over free-form, axis-aligned rects (walls that don't sit on
+    # a tile grid). Rects need x, y, width and height, e.g. pygame.Rect. The
+    # area is cut into square buckets and every rect is listed in each bucket
+    # it overlaps, so a query only tests the rects in the buckets it touches.
+    def __init__(self, rects, width, height, bucket_size=64):
+        super().__init__(math.ceil(width / bucket_size), math.ceil(height / bucket_size), bucket_size, bucket_size)
+        self.width = width
+        self.height = height
+        self.rects = list(rects)
+        # Buckets hold (left, top, right, bottom) edges, cheaper to test than Rects
+        self.buckets = [[] for _ in range(self.cols * self.rows)]
+        for rect in self.rects:
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            edges = (rect.x, rect.y, rect.x + rect.width, rect.y + rect.height)
+            cols, rows = self.bucket_range(*edges)
+            for row in rows:
+                for col in cols:
+                    self.buckets[row * self.cols + col].append(edges)
+
+    def bucket_range(self, left, top, right, bottom):
+        # Like cell_range, but anything beyond the edges lands in the edge
+        # buckets, so rects and queries partly outside the area still meet
+        last_col = self.cols - 1
+        last_row = self.rows - 1
+        first_col = min(max(int(left) // self.cell_width, 0), last_col)
+        end_col = min(max((math.ceil(right) - 1) // self.cell_width, 0), last_col)
+        first_row = min(max(int(top) // self.cell_height, 0), last_row)
+        end_row = min(max((math.ceil(bottom) - 1) // self.cell_height, 0), last_row)
+        return range(first_col, end_col + 1), range(first_row, end_row + 1)
+
+    def collides_at(self, left, top, width, height):
+        # Same answer as colliderect against every rect
+        if width <= 0 or height <= 0:
+            return False
+
+        right = left + width
+        bottom = top + height
+        cols, rows = self.bucket_range(left, top, right, bottom)
+        buckets = self.buckets
+        for row in rows:
+            base = row * self.cols
+            for col in cols:
+                for rect_left, rect_top, rect_right, rect_bottom in buckets[base + col]:
+                    if left < rect_right and rect_left < right and top < rect_bottom and rect_top < bottom:
+                        return True
+        return False
+
+    def collides(self, rect):
+        return self.collides_at(rect.x, rect.y, rect.width, rect.height)
+
+    def occupancy_mask(self, margin=0):
+        return OccupancyMask(self.rects, self.width, self.height, margin)
+
+
+class OccupancyMask:
+    # The rects rasterised to one byte per pixel. A pixel is set when the
+    # square reaching `margin` pixels around it, (x - margin, y - margin,
+    # 2 * margin, 2 * margin), overlaps a rect; with margin 0 it is set when
+    # the pixel itself is covered. Checking whether something that size fits
+    # at a point is then a single lookup.
+    def __init__(self, rects, width, height, margin=0):
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.cells = bytearray(width * height)
+
+        # Integer x with x - margin < rect right and rect left < x + margin
+        grow_before = max(margin - 1, 0)
+        for rect in rects:
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            left = max(rect.x - grow_before, 0)
+            right = min(rect.x + rect.width + margin, width)
+            top = max(rect.y - grow_before, 0)
+            bottom = min(rect.y + rect.height + margin, height)
+            if left >= right:
+                continue
+            span = b"\x01" * (right - left)
+            for y in range(top, bottom):
+                start = y * width + left
+                self.cells[start:start + len(span)] = span
+
+    def is_blocked(self, x, y):
+        # Points outside the masked area are never blocked
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x] == 1
+        return False
+
+
+class DotGrid(CellGrid):
+    # Dots and power pellets indexed by cell. `bits` has one bit per cell that
+    # still holds an uneaten item, so the whole dot state is a single int that
+    # can be compared, hashed or stored; `remaining` counts the set bits.
+    def __init__(self, cols, rows, cell_width, cell_height):
+        super().__init__(cols, rows, cell_width, cell_height)
+        self.items = {}
+        self.bits = 0
+        self.remaining = 0
+
+    def add(self, item):
+        # item needs x, y (pixel centre), radius and a collected flag
+        index = (item.y // self.cell_height) * self.cols + item.x // self.cell_width
+        self.items[index] = item
+        self.bits |= 1 << index
+        self.remaining += 1
+
+    def collect(self, rect):
+        # Marks and returns the items the rect touches; only the cells under the
+        # rect are looked at, since every item sits inside its own cell
+        eaten = []
+        if not self.bits:
+            return eaten
+
+        left, top, width, height = rect.x, rect.y, rect.width, rect.height
+        cols, rows = self.cell_range(left, top, width, height)
+        for row in rows:
+            for col in cols:
+                index = row * self.cols + col
+                if not self.bits >> index & 1:
+                    continue
+
+                item = self.items[index]
+                size = item.radius * 2
+                if (left < item.x - item.radius + size and item.x - item.radius < left + width
+                        and top < item.y - item.radius + size and item.y - item.radius < top + height):
+                    item.collected = True
+                    self.bits &= ~(1 << index)
+                    self.remaining -= 1
+                    eaten.append(item)
+        return eaten
+
+
+class SpatialHash(CellGrid):
+    # Moving entities bucketed by the maze cell their centre is in. Entities
+    # need x, y and radius; two of them touch when their square rects
+    # overlap, the same test as colliderect on their get_rect()s. A query
+    # only looks at the buckets within `reach` cells, which is enough for
+    # any two entities no bigger than max_radius.
+    def __init__(self, cols, rows, cell_width, cell_height, max_radius):
+        super().__init__(cols, rows, cell_width, cell_height)
+        self.reach_cols = math.ceil(2 * max_radius / cell_width)
+        self.reach_rows = math.ceil(2 * max_radius / cell_height)
+        self.buckets = {}  # cell index -> entities
+        self.cells = {}  # entity -> cell index
+
+    def cell_of(self, x, y):
+        # Entities sit exactly on the right/bottom edge while wrapping around
+        col = min(max(int(x) // self.cell_width, 0), self.cols - 1)
+        row = min(max(int(y) // self.cell_height, 0), self.rows - 1)
+        return row * self.cols + col
+
+    def insert(self, entity):
+        index = self.cell_of(entity.x, entity.y)
+        self.cells[entity] = index
+        self.buckets.setdefault(index, []).append(entity)
+
+    def remove(self, entity):
+        self.buckets[self.cells.pop(entity)].remove(entity)
+
+    def move(self, entity):
+        # Call after the entity moved; only changes buckets when it left its cell
+        index = self.cell_of(entity.x, entity.y)
+        old_index = self.cells[entity]
+        if index != old_index:
+            self.buckets[old_index].remove(entity)
+            self.buckets.setdefault(index, []).append(entity)
+            self.cells[entity] = index
+
+    def nearby(self, x, y):
+        index = self.cell_of(x, y)
+        col, row = index % self.cols, index // self.cols
+        for near_row in range(max(row - self.reach_rows, 0), min(row + self.reach_rows, self.rows - 1) + 1):
+            for near_col in range(max(col - self.reach_cols, 0), min(col + self.reach_cols, self.cols - 1) + 1):
+                bucket = self.buckets.get(near_row * self.cols + near_col)
+                if bucket:
+                    yield from bucket
+
+    def overlapping(self, entity):
+        # Every other entity in the hash whose rect overlaps this one's
+        for other in self.nearby(entity.x, entity.y):
+            if other is not entity:
+                reach = entity.radius + other.radius
+                if abs(entity.x - other.x) < reach and abs(entity.y - other.y) < reach:
+                    yield other
+
+    def pairs(self):
+        # Each overlapping pair of entities in the hash once, e.g. ghost-ghost contacts
+        for entity in self.cells:
+            for other in self.overlapping(entity):
+                if id(entity) < id(other):
+                    yield entity, other
+
+
+DIRECTIONS = ["right", "left", "up", "down"]
+DIRECTION_STEPS = {"right": (1, 0), "left": (-1, 0), "up": (0, -1), "down": (0, 1)}
+
+
+class NavGrid:
+    # Shortest paths through the maze. Moving off one edge of the grid comes
+    # back in on the opposite edge, the same way entities wrap around the screen.
+    # One BFS per target cell, run the first time that cell is asked for.
+    def __init__(self, layout):
+        self.rows = len(layout)
+        self.cols = len(layout[0])
+        self.open = [[cell != WALL for cell in row] for row in layout]
+        self._next_moves = {}
+
+    def cell_index(self, col, row):
+        return (row % self.rows) * self.cols + (col % self.cols)
+
+    def neighbours(self, col, row):
+        for direction in DIRECTIONS:
+            step_x, step_y = DIRECTION_STEPS[direction]
+            next_col = (col + step_x) % self.cols
+            next_row = (row + step_y) % self.rows
+            if self.open[next_row][next_col]:
+                yield direction, next_col, next_row
+
+    def distances(self, target_col, target_row):
+        # BFS from the target; unreachable cells and walls stay None
+        dist = [None] * (self.rows * self.cols)
+        target_col %= self.cols
+        target_row %= self.rows
+        if not self.open[target_row][target_col]:
+            return dist
+
+        dist[self.cell_index(target_col, target_row)] = 0
+        queue = [(target_col, target_row)]
+        for col, row in queue:
+            next_dist = dist[self.cell_index(col, row)] + 1
+            for _, next_col, next_row in self.neighbours(col, row):
+                index = self.cell_index(next_col, next_row)
+                if dist[index] is None:
+                    dist[index] = next_dist
+                    queue.append((next_col, next_row))
+        return dist
+
+    def next_moves(self, target_col, target_row):
+        # For every cell, the direction of the first step towards the target
+        target = self.cell_index(target_col, target_row)
+        moves = self._next_moves.get(target)
+        if moves is None:
+            dist = self.distances(target_col, target_row)
+            moves = [None] * len(dist)
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    here = dist[self.cell_index(col, row)]
+                    if not here:
+                        continue
+                    for direction, next_col, next_row in self.neighbours(col, row):
+                        if dist[self.cell_index(next_col, next_row)] == here - 1:
+                            moves[self.cell_index(col, row)] = direction
+                            break
+            self._next_moves[target] = moves
+        return moves
+
+    def next_move(self, col, row, target_col, target_row):
+        return self.next_moves(target_col, target_row)[self.cell_index(col, row)]
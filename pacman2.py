@@ -3,7 +3,8 @@ import random
 import sys
 import math
 
-pygame.init()
+from engine import bootstrap
+from timestep import run_fixed
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -22,9 +23,13 @@ CYAN = (0, 255, 255)
 ORANGE = (255, 165, 0)
 BLUE = (0, 0, 255)
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
+screen = None
+
+
+def init_engine():
+    global screen
+    screen = bootstrap(SCREEN_WIDTH, SCREEN_HEIGHT)
+
 
 MENU = 0
 PLAYING = 1
@@ -265,14 +270,11 @@ class Game:
         pygame.display.flip()
 
 def main():
+    init_engine()
+    clock = pygame.time.Clock()
     game = Game()
 
-    running = True
-    while running:
-        game.handle_events()
-        game.update()
-        game.draw()
-        clock.tick(60)
+    run_fixed(game, clock)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,111 @@
+# Reset/step environment over the RAIDACODEZDES.py Game for training bots.
+# Follows the Gymnasium API (reset -> obs, info; step -> obs, reward,
+# terminated, truncated, info) without depending on it. Runs headless and
+# unthrottled: one step() is one logic tick.
+#
+# Observation (dict of NumPy arrays):
+#   walls   uint8 (rows, cols)  1 = wall
+#   dots    uint8 (rows, cols)  1 = dot, 2 = power pellet, 0 = eaten or none
+#   pacman  int16 (3,)          x, y, direction code
+#   ghosts  int16 (n, 3)        x, y, direction code per ghost
+# Actions are direction codes, indices into maze_grid.DIRECTIONS
+# (0 right, 1 left, 2 up, 3 down); reward is the score gained by the step.
+import sys
+import time
+
+import numpy as np
+
+from RAIDACODEZDES import GAME_OVER, WIN, Game, PowerPellet
+from maze_grid import DIRECTIONS
+
+N_ACTIONS = len(DIRECTIONS)
+
+
+class PacmanEnv:
+    def __init__(self, max_steps=None):
+        self.max_steps = max_steps  # truncate episodes after this many steps
+        self.game = None
+        self.steps = 0
+        # Per level: wall array and the dot values laid out at load time
+        self._walls = {}
+        self._dot_values = {}
+
+    def reset(self, seed=None, options=None):
+        level = (options or {}).get("level", 0)
+        self.game = Game(seed=seed, level=level)
+        self.steps = 0
+        return self._observation(), self._info()
+
+    def step(self, action):
+        game = self.game
+        score = game.score
+        game.step(DIRECTIONS[action])
+        self.steps += 1
+
+        reward = game.score - score
+        terminated = game.state == GAME_OVER or game.state == WIN
+        truncated = self.max_steps is not None and self.steps >= self.max_steps and not terminated
+        return self._observation(), reward, terminated, truncated, self._info()
+
+    def _level_arrays(self):
+        level = self.game.level
+        if level not in self._walls:
+            wall_grid = self.game.wall_grid
+            self._walls[level] = np.array(wall_grid.cells, dtype=np.uint8)
+
+            # Every dot/pellet cell of a fresh level, with its observation value
+            dot_grid = self.game.dot_grid
+            values = np.zeros(dot_grid.rows * dot_grid.cols, dtype=np.uint8)
+            for index, item in dot_grid.items.items():
+                values[index] = 2 if isinstance(item, PowerPellet) else 1
+            self._dot_values[level] = values
+        return self._walls[level], self._dot_values[level]
+
+    def _observation(self):
+        game = self.game
+        walls, dot_values = self._level_arrays()
+
+        # DotGrid.bits has one bit per cell still holding an item
+        dot_grid = game.dot_grid
+        n_cells = dot_grid.rows * dot_grid.cols
+        bits = np.frombuffer(dot_grid.bits.to_bytes((n_cells + 7) // 8, "little"), dtype=np.uint8)
+        remaining = np.unpackbits(bits, count=n_cells, bitorder="little")
+        dots = (dot_values * remaining).reshape(dot_grid.rows, dot_grid.cols)
+
+        pacman = game.pacman
+        return {
+            "walls": walls,
+            "dots": dots,
+            "pacman": np.array([pacman.x, pacman.y, DIRECTIONS.index(pacman.direction)], dtype=np.int16),
+            "ghosts": np.array([[ghost.x, ghost.y, DIRECTIONS.index(ghost.direction)] for ghost in game.ghosts],
+                               dtype=np.int16).reshape(-1, 3),
+        }
+
+    def _info(self):
+        game = self.game
+        return {"score": game.score, "lives": game.lives, "level": game.level,
+                "state": game.state, "seed": game.seed}
+
+
+def main():
+    # Quick throughput check: python pacman_env.py [steps]
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    env = PacmanEnv()
+    rng = np.random.default_rng(0)
+    env.reset(seed=0)
+    episodes = 0
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(rng.integers(N_ACTIONS))
+        if terminated or truncated:
+            episodes += 1
+            env.reset()
+    elapsed = time.perf_counter() - start
+
+    print(f"{steps / elapsed:.0f} steps/s, {episodes} episodes finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,11 @@ import random
 import sys
 import math
 
-pygame.init()
+from ascii_level import GATE, OPPOSITE, AsciiLevel
+from assets import load_image
+from engine import bootstrap
+from maze_grid import DotGrid, wall_rects
+from timestep import run_fixed
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -13,6 +17,31 @@ GHOST_SPEED = 2
 DOT_SIZE = 8
 SCORE_PER_DOT = 10
 
+# 28x21 maze, see ascii_level.py for the characters
+LEVEL = [
+    "############################",
+    "#............##............#",
+    "#.####.#####.##.#####.####.#",
+    "#..........................#",
+    "#.####.##.########.##.####.#",
+    "#......##....##....##......#",
+    "######.##### ## #####.######",
+    "     #.##          ##.#     ",
+    "######.## ###--### ##.######",
+    "      .   # GGGG #   .      ",
+    "######.## ######## ##.######",
+    "     #.##          ##.#     ",
+    "######.## ######## ##.######",
+    "#............##............#",
+    "#.####.#####.##.#####.####.#",
+    "#...##.......P........##...#",
+    "###.##.##.########.##.##.###",
+    "#......##....##....##......#",
+    "#.##########.##.##########.#",
+    "#..........................#",
+    "############################",
+]
+
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 YELLOW = (255, 255, 0)
@@ -22,9 +51,13 @@ CYAN = (0, 255, 255)
 ORANGE = (255, 165, 0)
 BLUE = (0, 0, 255)
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
+screen = None
+
+
+def init_engine():
+    global screen
+    screen = bootstrap(SCREEN_WIDTH, SCREEN_HEIGHT)
+
 
 MENU = 0
 PLAYING = 1
@@ -45,31 +78,24 @@ class PacMan:
         self.image = pygame.image.load('pacman.png')
         self.image = pygame.transform.scale(self.image, (30, 30))
 
-    def update(self):
+    def update(self, level):
         self.animation_counter += 1
         if self.animation_counter >= 10:
             self.mouth_open = not self.mouth_open
             self.animation_counter = 0
 
-        if self.direction == "right":
-            self.x += self.speed
-        elif self.direction == "left":
-            self.x -= self.speed
-        elif self.direction == "up":
-            self.y -= self.speed
-        elif self.direction == "down":
-            self.y += self.speed
-
-        if self.x < 0:
-            self.x = SCREEN_WIDTH
-        elif self.x > SCREEN_WIDTH:
-            self.x = 0
-        if self.y < 0:
-            self.y = SCREEN_HEIGHT
-        elif self.y > SCREEN_HEIGHT:
-            self.y = 0
-
-        self.direction = self.next_direction
+        # Turning back doesn't have to wait for a cell centre
+        if self.next_direction == OPPOSITE[self.direction]:
+            self.direction = self.next_direction
+        level.move(self, level.walls)
+
+    def choose_direction(self, open_directions):
+        # At a cell centre: take the queued turn if it's free, else keep going, else stop
+        if self.next_direction in open_directions:
+            return self.next_direction
+        if self.direction in open_directions:
+            return self.direction
+        return None
 
     def draw(self):
         screen.blit(self.image, (self.x - 15, self.y - 15))
@@ -78,51 +104,47 @@ class PacMan:
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
 
 class Ghost:
-    def __init__(self, x, y, color):
+    def __init__(self, x, y, color, rng):
         self.x = x
         self.y = y
         self.color = color
         self.radius = 15
-        self.direction = random.choice(["right", "left", "up", "down"])
+        self.rng = rng
+        self.direction = self.rng.choice(["right", "left", "up", "down"])
+        self.wanted_direction = self.direction
         self.speed = GHOST_SPEED
         self.change_direction_counter = 0
 
         self.image = pygame.image.load('ghost.webp')
         self.image = pygame.transform.scale(self.image, (30, 30))
 
-    def update(self, pacman):
+    def update(self, pacman, level):
         self.change_direction_counter += 1
         if self.change_direction_counter >= 60:
-            if random.random() < 0.7:
+            if self.rng.random() < 0.7:
                 dx = pacman.x - self.x
                 dy = pacman.y - self.y
 
                 if abs(dx) > abs(dy):
-                    self.direction = "right" if dx > 0 else "left"
+                    self.wanted_direction = "right" if dx > 0 else "left"
                 else:
-                    self.direction = "down" if dy > 0 else "up"
+                    self.wanted_direction = "down" if dy > 0 else "up"
             else:
-                self.direction = random.choice(["right", "left", "up", "down"])
+                self.wanted_direction = self.rng.choice(["right", "left", "up", "down"])
 
             self.change_direction_counter = 0
 
-        if self.direction == "right":
-            self.x += self.speed
-        elif self.direction == "left":
-            self.x -= self.speed
-        elif self.direction == "up":
-            self.y -= self.speed
-        elif self.direction == "down":
-            self.y += self.speed
-
-        if self.x < 0:
-            self.x = SCREEN_WIDTH
-        elif self.x > SCREEN_WIDTH:
-            self.x = 0
-        if self.y < 0:
-            self.y = SCREEN_HEIGHT
-        elif self.y > SCREEN_HEIGHT:
-            self.y = 0
+        level.move(self, level.ghost_walls)
+
+    def choose_direction(self, open_directions):
+        # At a cell centre: no turning back unless it's a dead end, and head
+        # the wanted way when that's one of the options
+        options = [direction for direction in open_directions if direction != OPPOSITE[self.direction]]
+        if not options:
+            return open_directions[0] if open_directions else None
+        if self.wanted_direction in options:
+            return self.wanted_direction
+        return self.rng.choice(options)
 
     def draw(self):
         screen.blit(self.image, (self.x - 15, self.y - 15))
@@ -137,8 +159,7 @@ class Dot:
         self.radius = DOT_SIZE // 2
         self.collected = False
 
-        self.image = pygame.image.load('dot.png')
-        self.image = pygame.transform.scale(self.image, (DOT_SIZE, DOT_SIZE))
+        self.image = load_image('dot.png', (DOT_SIZE, DOT_SIZE))
 
     def draw(self):
         if not self.collected:
@@ -148,48 +169,44 @@ class Dot:
         return pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
 
 class Game:
-    def __init__(self):
-        self.reset()
+    def __init__(self, seed=None):
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # All randomness goes through one seeded RNG, so a seed reproduces the run
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
 
-    def reset(self):
         self.state = MENU
-        self.pacman = PacMan(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-        self.ghosts = [
-            Ghost(100, 100, RED),
-            Ghost(SCREEN_WIDTH - 100, 100, PINK),
-            Ghost(100, SCREEN_HEIGHT - 100, CYAN),
-            Ghost(SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100, ORANGE)
-        ]
-        self.dots = []
         self.score = 0
         self.lives = 3
-        self.level = [
-            "############################",
-            "#............##............#",
-            "#.####.#####.##.#####.####.#",
-            "#..........................#",
-            "#.####.##.########.##.####.#",
-            "#......##....##....##......#",
-            "######.##### ## #####.######",
-            "     #.##          ##.#     ",
-            "######.## ###--### ##.######",
-            "      .   #      #   .      ",
-            "######.## ######## ##.######",
-            "     #.##          ##.#     ",
-            "######.## ######## ##.######",
-            "#............##............#",
-            "#.####.#####.##.#####.####.#",
-            "#...##................##...#",
-            "###.##.##.########.##.##.###",
-            "#......##....##....##......#",
-            "#.##########.##.##########.#",
-            "#..........................#",
-            "############################",
-        ]
-
-        for x in range(DOT_SIZE * 2, SCREEN_WIDTH, DOT_SIZE * 4):
-            for y in range(DOT_SIZE * 2, SCREEN_HEIGHT, DOT_SIZE * 4):
-                self.dots.append(Dot(x, y))
+
+        # Walls, dots and spawn points come from the text maze, compiled once
+        cell_size = min(SCREEN_WIDTH // len(LEVEL[0]), SCREEN_HEIGHT // len(LEVEL))
+        self.level = AsciiLevel(LEVEL, cell_size)
+        self.pacman = PacMan(*self.level.centre(*self.level.pacman_spawn))
+        self.ghosts = [Ghost(*self.level.centre(col, row), color, self.rng)
+                       for (col, row), color in zip(self.level.ghost_spawns, [RED, PINK, CYAN, ORANGE])]
+
+        self.dot_grid = DotGrid(self.level.cols, self.level.rows, cell_size, cell_size)
+        for col, row in self.level.dot_cells:
+            self.dot_grid.add(Dot(*self.level.centre(col, row)))
+
+        self.background = None  # walls, drawn on the first frame
+
+    def build_background(self):
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.background.fill(BLACK)
+        size = self.level.cell_size
+        for col, row, width, height in wall_rects(self.level.layout):
+            pygame.draw.rect(self.background, BLUE, (col * size, row * size, width * size, height * size))
+        for row, cells in enumerate(self.level.layout):
+            for col, cell in enumerate(cells):
+                if cell == GATE:
+                    # The gate: a thin bar across the cell
+                    pygame.draw.rect(self.background, PINK, (col * size, row * size + size // 2 - 2, size, 4))
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -216,34 +233,30 @@ class Game:
 
     def update(self):
         if self.state == PLAYING:
-            self.pacman.update()
+            self.pacman.update(self.level)
 
             for ghost in self.ghosts:
-                ghost.update(self.pacman)
+                ghost.update(self.pacman, self.level)
 
                 if self.pacman.get_rect().colliderect(ghost.get_rect()):
                     self.lives -= 1
                     if self.lives <= 0:
                         self.state = GAME_OVER
                     else:
-                        self.pacman.x = SCREEN_WIDTH // 2
-                        self.pacman.y = SCREEN_HEIGHT // 2
-                        for g in self.ghosts:
-                            g.x = random.randint(50, SCREEN_WIDTH - 50)
-                            g.y = random.randint(50, SCREEN_HEIGHT - 50)
-
-            for dot in self.dots:
-                if not dot.collected and self.pacman.get_rect().colliderect(dot.get_rect()):
-                    dot.collected = True
-                    self.score += SCORE_PER_DOT
-
-            if all(dot.collected for dot in self.dots):
+                        # Everyone back to their spawn cell; eaten dots stay eaten
+                        self.pacman.x, self.pacman.y = self.level.centre(*self.level.pacman_spawn)
+                        for g, (col, row) in zip(self.ghosts, self.level.ghost_spawns):
+                            g.x, g.y = self.level.centre(col, row)
+
+            # Only the cells under Pac-Man are looked at
+            self.score += SCORE_PER_DOT * len(self.dot_grid.collect(self.pacman.get_rect()))
+
+            if not self.dot_grid.remaining:
                 self.state = GAME_OVER
 
     def draw(self):
-        screen.fill(BLACK)
-
         if self.state == MENU:
+            screen.fill(BLACK)
             font = pygame.font.SysFont(None, 72)
             title = font.render("PAC-MAN", True, YELLOW)
             screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, SCREEN_HEIGHT // 3))
@@ -253,7 +266,11 @@ class Game:
             screen.blit(instruction, (SCREEN_WIDTH // 2 - instruction.get_width() // 2, SCREEN_HEIGHT // 2))
 
         elif self.state == PLAYING or self.state == GAME_OVER:
-            for dot in self.dots:
+            if self.background is None:
+                self.build_background()
+            screen.blit(self.background, (0, 0))
+
+            for dot in self.dot_grid.items.values():
                 dot.draw()
 
             self.pacman.draw()
@@ -288,14 +305,11 @@ class Game:
         pygame.display.flip()
 
 def main():
+    init_engine()
+    clock = pygame.time.Clock()
     game = Game()
 
-    running = True
-    while running:
-        game.handle_events()
-        game.update()
-        game.draw()
-        clock.tick(60)
+    run_fixed(game, clock)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,113 @@
+# Per-frame timing of the game's subsystems. Timings are summed per section
+# over a frame; the last WINDOW frames are kept for rolling percentiles, and
+# every frame can be appended to a CSV trace. A section costs two
+# perf_counter() calls, so this can stay on in normal builds.
+#
+#     profiler = FrameProfiler(["update", "draw"])
+#     profiler.start_trace("frames.csv")  # optional
+#     profiler.begin_frame()
+#     with profiler.section("update"):
+#         game.update()
+#     profiler.end_frame()
+import csv
+import time
+from collections import deque
+
+WINDOW = 300  # frames the percentiles are taken over
+PERCENTILES = (50, 95, 99)
+OVERLAY_REFRESH = 30  # frames between overlay text updates
+TRACE_FLUSH = 60  # frames between trace flushes, so a crash loses at most a second
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.current[self.name] += time.perf_counter() - self.start
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, len(sorted_values) * p // 100)]
+
+
+class FrameProfiler:
+    def __init__(self, sections, window=WINDOW):
+        self.names = list(sections)
+        self.current = dict.fromkeys(self.names, 0.0)
+        self.history = {name: deque(maxlen=window) for name in self.names + ["frame"]}
+        self._sections = {name: _Section(self, name) for name in self.names}
+        self.frame = 0
+        self.frame_start = None
+        self.show_overlay = False
+        self.overlay_lines = []
+
+        self.trace_file = None
+        self.trace = None
+
+    def start_trace(self, path):
+        # Appends one row per frame from now on: frame number, total and every section
+        self.close()
+        self.trace_file = open(path, "w", newline="")
+        self.trace = csv.writer(self.trace_file)
+        self.trace.writerow(["frame", "frame_ms"] + [f"{name}_ms" for name in self.names])
+
+    def section(self, name):
+        # Reused context manager; nesting the same name is not supported
+        return self._sections[name]
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        total = time.perf_counter() - self.frame_start
+        self.frame_start = None
+
+        self.history["frame"].append(total)
+        for name in self.names:
+            self.history[name].append(self.current[name])
+        if self.trace:
+            self.trace.writerow([self.frame, f"{total * 1000:.3f}"]
+                                + [f"{self.current[name] * 1000:.3f}" for name in self.names])
+        self.current = dict.fromkeys(self.names, 0.0)
+
+        self.frame += 1
+        if self.trace and self.frame % TRACE_FLUSH == 0:
+            self.trace_file.flush()
+        if self.show_overlay and self.frame % OVERLAY_REFRESH == 0:
+            self.overlay_lines = self.report()
+
+    def percentiles(self, name):
+        values = sorted(self.history[name])
+        return [percentile(values, p) * 1000 for p in PERCENTILES]
+
+    def report(self):
+        # One "name  p50 p95 p99" line per section, in milliseconds
+        width = max(len(name) for name in ["frame"] + self.names) + 1
+        header = "ms".ljust(width) + " ".join(f"p{p:<5}" for p in PERCENTILES)
+        lines = [header]
+        for name in ["frame"] + self.names:
+            lines.append(name.ljust(width) + " ".join(f"{value:<6.2f}" for value in self.percentiles(name)))
+        return lines
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.overlay_lines = self.report()
+
+    def close(self):
+        if self.trace_file:
+            self.trace_file.close()
+            self.trace_file = None
+            self.trace = None
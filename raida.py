@@ -2,9 +2,10 @@ import pygame
 import random
 import sys
 
-pygame.init()
-
-pygame.mixer_music.load('polish cow full song.mp3')
+from assets import frame_for_angle, rotated_frames
+from audio import Music
+from engine import bootstrap
+from timestep import run_fixed
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -24,9 +25,15 @@ ORANGE = (255, 165, 0)
 BLUE = (0, 0, 255)
 GREEN = (0, 255, 0)
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pac-Man")
-clock = pygame.time.Clock()
+screen = None
+music = Music()
+
+
+def init_engine():
+    global screen
+    screen = bootstrap(SCREEN_WIDTH, SCREEN_HEIGHT)
+    music.load('polish cow full song.mp3')
+
 
 MENU = 0
 PLAYING = 1
@@ -45,10 +52,15 @@ class PacMan:
         self.mouth_angle = 45
         self.animation_counter = 0
 
-        self.image = pygame.image.load('pacman.png')
-
-        self.image = pygame.transform.scale(self.image, (30, 30))
-
+        # One frame per direction, made once instead of re-rotating self.image every frame
+        frames = rotated_frames('pacman.png', (30, 30), 90)
+        self.images = {
+            "right": frame_for_angle(frames, 0),
+            "left": pygame.transform.flip(frames[0], True, False),
+            "up": frame_for_angle(frames, 90),
+            "down": frame_for_angle(frames, -90),
+        }
+        self.image = self.images[self.direction]
 
 
     def update(self):
@@ -61,13 +73,11 @@ class PacMan:
             self.x += self.speed
         elif self.direction == "left":
             self.x -= self.speed
-            self.image = pygame.transform.flip(self.image, True, False)
         elif self.direction == "up":
             self.y -= self.speed
-            self.image = pygame.transform.rotate(self.image, 90)
         elif self.direction == "down":
             self.y += self.speed
-            self.image = pygame.transform.rotate(self.image, -90)
+        self.image = self.images[self.direction]
 
         if self.x < 0:
             self.x = SCREEN_WIDTH
@@ -274,14 +284,11 @@ class Game:
         pygame.display.flip()
 
 def main():
+    init_engine()
+    clock = pygame.time.Clock()
     game = Game()
 
-    running = True
-    while running:
-        game.handle_events()
-        game.update()
-        game.draw()
-        clock.tick(60)
+    run_fixed(game, clock)
 
 if __name__ == "__main__":
     main()
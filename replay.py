@@ -0,0 +1,116 @@
+# Compact binary replays: the RNG seed, the starting level and every change of
+# Pac-Man's next_direction, indexed by logic tick. Together with a seeded Game
+# that is enough to re-run a session exactly.
+#
+# File layout (little endian):
+#   magic "PMRP", version u8, seed u64, level u8, ticks u32, input count u32,
+#   then one varint per input: (ticks since the previous input << 2) | direction
+import struct
+import sys
+import time
+
+from maze_grid import DIRECTIONS
+
+MAGIC = b"PMRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQBII")
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    def __init__(self, seed, level=0, inputs=None, ticks=0):
+        self.seed = seed
+        self.level = level
+        self.inputs = inputs if inputs is not None else []  # (tick, direction)
+        self.ticks = ticks
+        self.last_direction = "right"  # what a fresh PacMan starts with
+
+    def record(self, direction):
+        # Called once per PLAYING tick with the direction about to be used
+        if direction != self.last_direction:
+            self.inputs.append((self.ticks, direction))
+            self.last_direction = direction
+        self.ticks += 1
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.level, self.ticks, len(self.inputs)))
+        previous = 0
+        for tick, direction in self.inputs:
+            _write_varint(out, (tick - previous) << 2 | DIRECTIONS.index(direction))
+            previous = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, level, ticks, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Pac-Man replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+
+        inputs = []
+        pos = HEADER.size
+        tick = 0
+        for _ in range(count):
+            value, pos = _read_varint(data, pos)
+            tick += value >> 2
+            inputs.append((tick, DIRECTIONS[value & 3]))
+        return cls(seed, level, inputs, ticks)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def play(replay, game):
+    # Feed the recorded inputs through game.step as fast as possible.
+    # game must be freshly built with the replay's seed and level.
+    inputs = dict(replay.inputs)
+    for tick in range(replay.ticks):
+        game.step(inputs.get(tick))
+    return game
+
+
+def main():
+    # python replay.py FILE... - plays each replay headless and prints the outcome
+    from RAIDACODEZDES import Game
+
+    for path in sys.argv[1:]:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        game = play(replay, Game(seed=replay.seed, level=replay.level))
+        elapsed = time.perf_counter() - start
+
+        # Playing back records the same inputs again; a difference means the
+        # simulation no longer matches the build that made the file
+        exact = game.replay.inputs == replay.inputs and game.replay.ticks == replay.ticks
+        print(f"{path}: {replay.ticks} ticks in {elapsed:.2f}s, score {game.score}, "
+              f"lives {game.lives}, level {game.level + 1}, state {game.state}, "
+              f"{'exact' if exact else 'DIVERGED'}")
+
+
+if __name__ == "__main__":
+    main()
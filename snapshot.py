@@ -0,0 +1,85 @@
+# Plain value records of game state, for forking and rewinding a Game.
+# Records only hold numbers, strings and tuples (never Surfaces), so taking
+# one is a handful of attribute copies and they pickle small.
+
+
+class Record:
+    # Subclasses list the attributes to copy in __slots__
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    @classmethod
+    def capture(cls, obj):
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, getattr(obj, name))
+        return record
+
+    def apply(self, obj):
+        for name in self.__slots__:
+            setattr(obj, name, getattr(self, name))
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class PacManRecord(Record):
+    __slots__ = ("x", "y", "prev_x", "prev_y", "direction", "next_direction", "speed", "rotation",
+                 "mouth_open", "animation_index")
+
+
+class GhostRecord(Record):
+    __slots__ = ("x", "y", "prev_x", "prev_y", "color", "direction", "speed",
+                 "chasing", "frightened")
+
+
+class GameRecord(Record):
+    # What Game.snapshot() returns. dot_bits is DotGrid.bits; ghost_spawns
+    # holds (x, y) per ghost; timers is TimerWheel.state(); replay is (ticks,
+    # number of inputs, last direction) of the Replay being recorded.
+    __slots__ = ("state", "level", "score", "lives", "seed", "rng_state", "dot_bits",
+                 "pacman", "ghosts", "ghost_spawns", "timers", "ghosts_eaten", "replay")
+
+
+class RewindBuffer:
+    # The last `capacity` snapshots; older ones are overwritten, so memory stays fixed
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.snapshots = [None] * capacity
+        self.head = 0  # where the next snapshot goes
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, snapshot):
+        self.snapshots[self.head] = snapshot
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def peek(self, steps=1):
+        # The snapshot `steps` pushes ago (1 = the latest)
+        if not 1 <= steps <= self.count:
+            raise IndexError(f"only {self.count} snapshots to rewind through")
+        return self.snapshots[(self.head - steps) % self.capacity]
+
+    def rewind(self, steps=1):
+        # Like peek, but drops everything newer: the next push starts a new branch
+        snapshot = self.peek(steps)
+        for _ in range(steps - 1):
+            self.head = (self.head - 1) % self.capacity
+            self.snapshots[self.head] = None
+        self.count -= steps - 1
+        return snapshot
+
+    def clear(self):
+        self.snapshots = [None] * self.capacity
+        self.head = 0
+        self.count = 0
@@ -0,0 +1,45 @@
+import random
+
+from maze_grid import SpatialHash
+
+WIDTH = 800
+HEIGHT = 600
+CELL = 40
+
+
+class Entity:
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+
+
+def brute_force_pairs(entities):
+    pairs = set()
+    for i, entity in enumerate(entities):
+        for other in entities[i + 1:]:
+            reach = entity.radius + other.radius
+            if abs(entity.x - other.x) < reach and abs(entity.y - other.y) < reach:
+                pairs.add(frozenset((entity, other)))
+    return pairs
+
+
+def test_pairs_match_brute_force_for_a_swarm():
+    # 500 ghosts wandering the screen, checked again after every round of moves
+    rng = random.Random(18)
+    entities = [Entity(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), rng.choice([8, 15]))
+                for _ in range(500)]
+    spatial_hash = SpatialHash(WIDTH // CELL, HEIGHT // CELL, CELL, CELL, 15)
+    for entity in entities:
+        spatial_hash.insert(entity)
+
+    for _ in range(20):
+        found = list(spatial_hash.pairs())
+        assert found
+        assert len(found) == len(set(map(frozenset, found)))
+        assert set(map(frozenset, found)) == brute_force_pairs(entities)
+
+        for entity in entities:
+            entity.x = min(max(entity.x + rng.uniform(-30, 30), 0), WIDTH)
+            entity.y = min(max(entity.y + rng.uniform(-30, 30), 0), HEIGHT)
+            spatial_hash.move(entity)
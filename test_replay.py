@@ -0,0 +1,36 @@
+import random
+
+from RAIDACODEZDES import Game
+from replay import Replay
+
+DIRECTIONS = ["right", "left", "up", "down"]
+
+
+def record(seed, ticks):
+    # Drives a game with a seeded bot; returns it and its state after every tick
+    game = Game(seed=seed)
+    bot = random.Random(seed)
+    direction = None
+    states = []
+    for tick in range(ticks):
+        if tick % 37 == 0:
+            direction = bot.choice(DIRECTIONS)
+        game.step(direction)
+        states.append((game.pacman.x, game.pacman.y, game.lives, game.score, game.state))
+    return game, states
+
+
+def test_replay_matches_run_across_deaths():
+    # Seed 27 loses a life early and then repeats the direction it had before
+    game, states = record(27, 3000)
+    assert game.lives < 3
+
+    replay = Replay.from_bytes(game.replay.to_bytes())
+    playback = Game(seed=replay.seed, level=replay.level)
+    inputs = dict(replay.inputs)
+    for tick in range(replay.ticks):
+        playback.step(inputs.get(tick))
+        state = (playback.pacman.x, playback.pacman.y, playback.lives, playback.score, playback.state)
+        assert state == states[tick], f"diverged at tick {tick}"
+
+    assert playback.replay.inputs == replay.inputs
@@ -0,0 +1,87 @@
+# Tick-based timer wheel for game events. Timers are plain keys (strings or
+# tuples of ints and strings) that come back out of advance() on the tick
+# they are due, so only the objects something is due for get touched, and the
+# pending timers are plain values a snapshot can hold.
+#
+#     timers = TimerWheel()
+#     timers.set("frightened_end", 360)   # 360 ticks from now
+#     timers.set(("ghost", 2), 60)
+#     ...
+#     for key in timers.advance():        # once per logic tick
+#         ...
+#
+# Setting a key that is already pending moves it; each key fires at most once
+# per set(). Keys due on the same tick come out in the order they were set.
+WHEEL_SIZE = 256  # slots; longer delays wait for the wheel to come round again
+
+
+class TimerWheel:
+    def __init__(self, size=WHEEL_SIZE):
+        self.size = size
+        self.slots = [[] for _ in range(size)]  # keys by due tick % size, in set() order
+        self.due = {}  # pending key -> tick it fires on
+        self.now = 0  # ticks advanced so far
+
+    def set(self, key, delay):
+        if delay < 1:
+            raise ValueError(f"timer delay must be at least one tick, got {delay}")
+        when = self.now + delay
+        self.due[key] = when
+        # A moved key leaves its old slot entry behind; advance() drops it
+        self.slots[when % self.size].append(key)
+
+    def cancel(self, key):
+        self.due.pop(key, None)
+
+    def remaining(self, key):
+        # Ticks until key fires, or None if it isn't pending
+        when = self.due.get(key)
+        return None if when is None else when - self.now
+
+    def advance(self):
+        # One tick; returns the keys due on it
+        self.now += 1
+        index = self.now % self.size
+        slot = self.slots[index]
+        if not slot:
+            return []
+
+        fired = []
+        later = []  # due on a later turn of the wheel
+        for key in slot:
+            when = self.due.get(key)
+            if when == self.now:
+                del self.due[key]
+                fired.append(key)
+            elif when is not None and when > self.now and when % self.size == index:
+                later.append(key)
+        self.slots[index] = later
+        return fired
+
+    def clear(self):
+        self.slots = [[] for _ in range(self.size)]
+        self.due = {}
+        self.now = 0
+
+    def state(self):
+        # (now, ((key, due tick), ...)) in firing order, for snapshots
+        pending = []
+        seen = set()
+        for offset in range(1, self.size + 1):
+            index = (self.now + offset) % self.size
+            for key in self.slots[index]:
+                when = self.due.get(key)
+                if when is not None and when % self.size == index and key not in seen:
+                    seen.add(key)
+                    pending.append((key, when))
+        pending.sort(key=lambda entry: entry[1])
+        return self.now, tuple(pending)
+
+    def load(self, state):
+        # Inverse of state()
+        now, pending = state
+        self.clear()
+        self.now = now
+        for key, when in pending:
+            self.due[key] = when
+            self.slots[when % self.size].append(key)
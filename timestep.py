@@ -0,0 +1,73 @@
+# Fixed-timestep game loop: logic runs at TICK_RATE ticks per second of game
+# time no matter how long a frame takes to draw.
+#
+#     timestep = FixedTimestep()
+#     while running:
+#         for _ in range(timestep.advance(clock.tick(RENDER_FPS) / 1000)):
+#             game.update()
+#         if timestep.should_draw():
+#             game.draw(timestep.alpha)
+TICK_RATE = 60
+# Logic ticks a single frame may catch up on. Past that the leftover time is
+# dropped and the game slows down instead of spiralling into ever longer frames.
+MAX_TICKS_PER_FRAME = 8
+# Frames in a row that may go undrawn while the logic is behind
+MAX_SKIPPED_FRAMES = 4
+# Frame cap for run_fixed(); above TICK_RATE so a tick is drawn soon after it runs
+POLL_FPS = 120
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, max_ticks=MAX_TICKS_PER_FRAME):
+        self.tick_time = 1.0 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        self.time_scale = 1.0  # > 1 fast-forwards the game
+        self.behind = False
+        self.skipped_frames = 0
+
+    def advance(self, elapsed):
+        # Adds `elapsed` seconds of real time and returns how many ticks to run
+        max_ticks = self.max_ticks * max(1, int(self.time_scale))
+        self.accumulator += elapsed * self.time_scale
+        ticks = min(int(self.accumulator / self.tick_time), max_ticks)
+        self.accumulator -= ticks * self.tick_time
+
+        # Still a full tick short after catching up: the machine can't keep up.
+        # The caller can skip drawing this frame; time beyond another frame's
+        # worth of catching up is dropped.
+        self.behind = self.accumulator >= self.tick_time
+        self.accumulator = min(self.accumulator, max_ticks * self.tick_time)
+        return ticks
+
+    def should_draw(self):
+        # Under load, drop some frames so the logic can catch up
+        if self.behind and self.skipped_frames < MAX_SKIPPED_FRAMES:
+            self.skipped_frames += 1
+            return False
+        self.skipped_frames = 0
+        return True
+
+    @property
+    def alpha(self):
+        # How far between the last tick and the next one the current frame is
+        return min(self.accumulator / self.tick_time, 1.0)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+def run_fixed(game, clock, fps=POLL_FPS):
+    # Loop for games whose draw() has no interpolation: game.update() at
+    # TICK_RATE, game.draw() once after each frame that ran ticks. Frames
+    # come faster than ticks, so each tick reaches the screen within one
+    # short frame instead of alternating 0 and 2 ticks per 60 Hz frame.
+    timestep = FixedTimestep()
+    while True:
+        elapsed = clock.tick(fps) / 1000
+        game.handle_events()
+        ticks = timestep.advance(elapsed)
+        for _ in range(ticks):
+            game.update()
+        if ticks and timestep.should_draw():
+            game.draw()
@@ -0,0 +1,111 @@
+# Runs a bot policy over many seeded RAIDACODEZDES.py episodes on every CPU
+# core and streams one CSV row per episode.
+#
+#     python tournament.py --episodes 10000 --policy my_bot:policy --out results.csv
+#
+# A policy is a function policy(game, rng) -> "right"/"left"/"up"/"down" or
+# None, called once per tick; rng is a random.Random seeded from the episode
+# seed, so every episode is reproducible from its row.
+import argparse
+import csv
+import importlib
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from maze_grid import DIRECTIONS
+
+FIELDS = ["seed", "score", "lives_lost", "ticks", "level", "result"]
+MAX_TICKS = 60 * 60 * 10  # ten minutes of game time
+
+# Set once per worker process by init_worker
+_game = None
+_policy = None
+_max_ticks = MAX_TICKS
+
+
+def random_policy(game, rng):
+    # Baseline: pick a new direction now and then
+    if rng.random() < 0.05:
+        return rng.choice(DIRECTIONS)
+    return None
+
+
+def load_policy(spec):
+    # "module:function", or the name of a function in this module
+    if ":" in spec:
+        module_name, name = spec.split(":", 1)
+        return getattr(importlib.import_module(module_name), name)
+    return globals()[spec]
+
+
+def init_worker(policy_spec, max_ticks):
+    # Import the game once per process; every episode then reuses the same
+    # Game, so level path tables are built once per worker, not per episode
+    global _game, _policy, _max_ticks
+    from RAIDACODEZDES import Game
+
+    _game = Game()
+    _policy = load_policy(policy_spec)
+    _max_ticks = max_ticks
+
+
+def run_episode(seed):
+    from RAIDACODEZDES import GAME_OVER, WIN
+
+    game = _game
+    game.reset(seed)
+    rng = random.Random(seed)
+    start_lives = game.lives
+
+    ticks = 0
+    while ticks < _max_ticks:
+        game.step(_policy(game, rng))
+        ticks += 1
+        if game.state == GAME_OVER or game.state == WIN:
+            break
+
+    result = "WIN" if game.state == WIN else "GAME_OVER" if game.state == GAME_OVER else "TIMEOUT"
+    return seed, game.score, start_lives - max(game.lives, 0), ticks, game.level + 1, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a Pac-Man bot over many seeded episodes.")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--policy", default="random_policy", help="module:function or a built-in policy name")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--out", default="tournament.csv")
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.episodes)
+    # Big enough chunks to keep IPC cheap, small enough to balance the cores
+    chunksize = max(1, args.episodes // (args.workers * 16))
+
+    total_score = 0
+    wins = 0
+    start = time.perf_counter()
+    with open(args.out, "w", newline="") as f, multiprocessing.Pool(
+            args.workers, initializer=init_worker, initargs=(args.policy, args.max_ticks)) as pool:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        # Rows are written as episodes finish, so a long run can be watched
+        # (and a crashed one still leaves everything done so far)
+        for done, row in enumerate(pool.imap_unordered(run_episode, seeds, chunksize), 1):
+            writer.writerow(row)
+            total_score += row[1]
+            wins += row[5] == "WIN"
+            if done % 1000 == 0:
+                f.flush()
+                print(f"{done}/{args.episodes} episodes", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.episodes} episodes in {elapsed:.1f}s on {args.workers} workers: "
+          f"mean score {total_score / max(args.episodes, 1):.1f}, {wins} wins -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()